@@ -0,0 +1,211 @@
+# admission_control.py
+#
+# Admission control for the generation routes: token buckets per client and
+# per policy, plus caps on concurrent generation requests, so a burst of
+# bulk callers is turned away with 429 instead of queueing up in front of
+# interactive users.
+#
+# Costs are weighted by the items a request asks for. A bucket may go into
+# debt: a request is admitted once the bucket holds min(cost, burst) tokens
+# and then pays its full cost, so a 50,000 item batch is possible even with
+# a smaller burst, but its client waits out the debt before the next one.
+# Batches are charged to policy buckets of their own, so the debt a batch
+# leaves behind never turns away interactive requests for the same policy.
+# Buckets refill lazily when touched, so every check is O(1) under one lock.
+#
+# Every limit is off (0) unless configured, from the environment at startup
+# or at runtime through configure():
+#
+#   ADMISSION_CLIENT_RATE / ADMISSION_CLIENT_BURST   items/s and burst size
+#                                                    per client
+#   ADMISSION_POLICY_RATE / ADMISSION_POLICY_BURST   the same per policy
+#   ADMISSION_MAX_CONCURRENT                         generation requests in
+#                                                    flight at once
+#   ADMISSION_MAX_CONCURRENT_BATCHES                 of those, /generate/batch
+#                                                    streams
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Buckets kept per kind; the least recently used are dropped beyond this
+MAX_BUCKETS = 10000
+# Retry-After for requests turned away by a concurrency cap (seconds)
+CONCURRENCY_RETRY_AFTER = 1
+
+LIMIT_NAMES = ('client_rate', 'client_burst', 'policy_rate', 'policy_burst',
+               'max_concurrent', 'max_concurrent_batches')
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is over a limit; maps to a 429 response."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f'Too many requests ({reason} limit); retry in '
+                         f'{retry_after} second(s).')
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted request's concurrency slots; release() is idempotent."""
+    __slots__ = ('_controller', '_batch', '_released')
+
+    def __init__(self, controller, batch):
+        self._controller = controller
+        self._batch = batch
+        self._released = False
+
+    def release(self):
+        controller = self._controller
+        with controller._lock:
+            if self._released:
+                return
+            self._released = True
+            controller._in_flight -= 1
+            if self._batch:
+                controller._batches_in_flight -= 1
+
+
+def _retry_after(seconds):
+    return max(1, math.ceil(seconds))
+
+
+class AdmissionController:
+
+    def __init__(self, **limits):
+        self._lock = threading.Lock()
+        self._limits = dict.fromkeys(LIMIT_NAMES, 0)
+        # key -> [tokens, last refill time]
+        self._buckets = {'client': OrderedDict(), 'policy': OrderedDict()}
+        self._in_flight = 0
+        self._batches_in_flight = 0
+        self.admitted = 0
+        self.rejected = dict.fromkeys(('client', 'policy', 'concurrency'), 0)
+        self.configure(**limits)
+
+    def configure(self, **limits):
+        """
+        Updates some or all limits (see LIMIT_NAMES; 0 disables one) and
+        returns the resulting set. Buckets keep their balance; a lower
+        burst applies from their next refill.
+        """
+        unknown = set(limits) - set(LIMIT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown limit(s): {', '.join(sorted(unknown))}.")
+        for name, value in limits.items():
+            if isinstance(value, bool) or not isinstance(
+                    value, (int, float)) or value < 0:
+                raise ValueError(f'{name} must be a non-negative number.')
+        with self._lock:
+            self._limits.update(limits)
+            for kind in ('client', 'policy'):
+                if not self._limits[f'{kind}_rate']:
+                    self._buckets[kind].clear()
+            return dict(self._limits)
+
+    def limits(self):
+        with self._lock:
+            return dict(self._limits)
+
+    def _take(self, kind, key, cost, now):
+        # Caller holds the lock. Returns seconds until the bucket could
+        # admit `cost`, or 0 after charging it.
+        rate = self._limits[f'{kind}_rate']
+        if not rate:
+            return 0
+        burst = self._limits[f'{kind}_burst'] or rate
+        buckets = self._buckets[kind]
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= MAX_BUCKETS:
+                buckets.popitem(last=False)
+            bucket = buckets[key] = [burst, now]
+        else:
+            buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        needed = min(cost, burst)
+        if bucket[0] < needed:
+            return (needed - bucket[0]) / rate
+        bucket[0] -= cost
+        return 0
+
+    def _refund(self, kind, key, cost):
+        bucket = self._buckets[kind].get(key)
+        if bucket is not None:
+            bucket[0] += cost
+
+    def admit(self, client, policy, cost=1, batch=False):
+        """
+        Charges `cost` items to the client's and the policy's buckets (the
+        policy's batch bucket for batches) and takes a concurrency slot.
+        Returns a Ticket to release() once the response is done, or raises
+        AdmissionRejected. `policy` may be any hashable key.
+        """
+        if batch:
+            policy = ('batch', policy)
+        now = time.monotonic()
+        with self._lock:
+            limits = self._limits
+            if (limits['max_concurrent']
+                    and self._in_flight >= limits['max_concurrent']) or (
+                        batch and limits['max_concurrent_batches']
+                        and self._batches_in_flight >=
+                        limits['max_concurrent_batches']):
+                self.rejected['concurrency'] += 1
+                raise AdmissionRejected('concurrency',
+                                        CONCURRENCY_RETRY_AFTER)
+
+            wait = self._take('client', client, cost, now)
+            if wait:
+                self.rejected['client'] += 1
+                raise AdmissionRejected('client', _retry_after(wait))
+            wait = self._take('policy', policy, cost, now)
+            if wait:
+                # Don't charge the client for a request that isn't served
+                self._refund('client', client, cost)
+                self.rejected['policy'] += 1
+                raise AdmissionRejected('policy', _retry_after(wait))
+
+            self._in_flight += 1
+            if batch:
+                self._batches_in_flight += 1
+            self.admitted += 1
+        return Ticket(self, batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limits': dict(self._limits),
+                'in_flight': self._in_flight,
+                'batches_in_flight': self._batches_in_flight,
+                'clients': len(self._buckets['client']),
+                'policies': len(self._buckets['policy']),
+                'admitted': self.admitted,
+                'rejected': dict(self.rejected)
+            }
+
+
+def limits_from_env(environ=os.environ):
+    """Limits configured through ADMISSION_* variables (see above)."""
+    return {
+        name: float(environ.get(f'ADMISSION_{name.upper()}', 0))
+        for name in LIMIT_NAMES
+    }
+
+
+if __name__ == "__main__":
+    # A batch deep in debt must not turn away interactive requests for the
+    # same policy from other clients
+    controller = AdmissionController(policy_rate=100, policy_burst=200)
+    controller.admit('bulk', 'adhoc', cost=5000, batch=True).release()
+    try:
+        controller.admit('bulk', 'adhoc', cost=5000, batch=True)
+        raise AssertionError('second batch was not rate limited')
+    except AdmissionRejected as e:
+        assert e.reason == 'policy', e.reason
+    for _ in range(100):
+        controller.admit('browser', 'adhoc').release()
+    print(controller.stats())
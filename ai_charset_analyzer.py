@@ -1,9 +1,35 @@
 # ai_charset_analyzer.py
+import os
 import string
 
+from bounded_cache import memoize
+
 # Expanded ambiguous characters list (consistent with password_generator.py)
 AMBIGUOUS_CHARS = 'Il1Lo0O|[]{}()/\'"`~,.;:<> '
 
+# Recommendation cache: entries kept and how long each stays valid (seconds)
+CHARSET_CACHE_SIZE = int(os.environ.get('CHARSET_CACHE_SIZE', 1024))
+CHARSET_CACHE_TTL = float(os.environ.get('CHARSET_CACHE_TTL', 3600)) or None
+
+
+def _charset_cache_key(include_uppercase, include_lowercase, include_digits,
+                       include_symbols, exclude_ambiguous, exclude_custom_chars,
+                       custom_character_set='', no_repeating_chars=False):
+    # The analysis only looks at which characters occur, never their order
+    # or count, and ignores type flags and exclusions for custom sets.
+    if custom_character_set:
+        return ("".join(sorted(set(custom_character_set))),
+                bool(no_repeating_chars))
+    return (bool(include_uppercase), bool(include_lowercase),
+            bool(include_digits), bool(include_symbols),
+            bool(exclude_ambiguous),
+            exclude_custom_chars
+            and "".join(sorted(set(exclude_custom_chars))),
+            bool(no_repeating_chars))
+
+
+@memoize(maxsize=CHARSET_CACHE_SIZE, ttl=CHARSET_CACHE_TTL,
+         key=_charset_cache_key)
 def analyze_charset_definition(
     include_uppercase: bool,
     include_lowercase: bool,
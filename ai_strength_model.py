@@ -1,54 +1,39 @@
 # ai_strength_model.py
-import random
-import string
-import math  # For logarithmic calculations
-
-# Global variable to store loaded wordlists to avoid re-loading
-_WORDLISTS = {}
-
-
-# Function to load wordlist (duplicated from password_generator.py for self-containment)
-def load_wordlist(filepath="eff_long_wordlist.txt"):
-    # Use a dictionary to cache loaded wordlists
-    if filepath in _WORDLISTS:
-        return _WORDLISTS[filepath]
-
-    try:
-        with open(filepath, 'r') as f:
-            words = [line.strip() for line in f if line.strip()]
-        if not words:
-            raise ValueError(
-                f"Wordlist file '{filepath}' is empty or could not be read.")
-        _WORDLISTS[filepath] = words  # Cache the loaded wordlist
-        return words
-    except FileNotFoundError:
-        # Create dummy wordlists if not found for demonstration purposes
-        print(
-            f"Warning: Wordlist file not found at: {filepath}. Using a dummy wordlist for AI strength prediction."
-        )
-        if filepath == "eff_long_wordlist.txt":
-            dummy_words = [
-                "apple", "banana", "cherry", "date", "elephant", "flower",
-                "garden", "happiness", "internet", "jungle", "kangaroo",
-                "lemon", "mountain", "night", "ocean", "penguin", "queen",
-                "rainbow", "sunshine", "tiger", "umbrella", "violet",
-                "whisper", "xylophone", "yellow", "zebra"
-            ]
-        elif filepath == "eff_short_wordlist.txt":
-            dummy_words = [
-                "cat", "dog", "bird", "fish", "tree", "rock", "sky", "moon",
-                "star", "cloud"
-            ]
-        else:
-            dummy_words = ["word1", "word2", "word3"]  # Generic fallback
-
-        _WORDLISTS[filepath] = dummy_words  # Cache the dummy wordlist
-        return dummy_words
-    except Exception as e:
-        print(f"Error loading wordlist for AI strength prediction: {e}")
-        return []  # Return empty list on error
-
-
+import os
+
+from bounded_cache import memoize
+from entropy_calculator import passphrase_entropy_bits, password_entropy_bits
+from password_generator import compile_policy
+from wordlist_registry import get_wordlist
+
+# Score cache: entries kept and how long each stays valid (seconds)
+STRENGTH_CACHE_SIZE = int(os.environ.get('STRENGTH_CACHE_SIZE', 1024))
+STRENGTH_CACHE_TTL = float(os.environ.get('STRENGTH_CACHE_TTL', 3600)) or None
+
+
+def _strength_cache_key(length, include_uppercase, include_lowercase,
+                        include_digits, include_symbols, exclude_ambiguous,
+                        exclude_custom_chars, custom_character_set='',
+                        is_passphrase=False, num_words=0,
+                        require_min_char_types=False, no_repeating_chars=False,
+                        wordlist_name="eff_long_wordlist.txt",
+                        capitalization="none", placement="random"):
+    # Only the options the chosen mode actually scores are part of the key
+    if is_passphrase:
+        return (True, num_words, bool(include_digits), bool(include_symbols),
+                wordlist_name, capitalization, placement)
+    return (False, length, bool(include_uppercase), bool(include_lowercase),
+            bool(include_digits), bool(include_symbols),
+            bool(exclude_ambiguous),
+            exclude_custom_chars
+            and "".join(sorted(set(exclude_custom_chars))),
+            custom_character_set
+            and "".join(sorted(set(custom_character_set))),
+            bool(require_min_char_types), bool(no_repeating_chars))
+
+
+@memoize(maxsize=STRENGTH_CACHE_SIZE, ttl=STRENGTH_CACHE_TTL,
+         key=_strength_cache_key)
 def predict_strength(
     length: int,
     include_uppercase: bool,
@@ -62,48 +47,31 @@ def predict_strength(
     num_words: int = 0,
     require_min_char_types: bool = False,  # NEW: Parameter for AI prediction
     no_repeating_chars: bool = False,  # NEW: Parameter for AI prediction
-    wordlist_name: str = "eff_long_wordlist.txt"
-) -> int:  # NEW: Parameter for wordlist name
+    wordlist_name: str = "eff_long_wordlist.txt",  # NEW: Parameter for wordlist name
+    capitalization: str = "none",  # Passphrase capitalization mode
+    placement: str = "random"  # Passphrase digit/symbol placement
+) -> int:
     """
-    A simplified "AI" function to predict password strength based on characteristics.
+    Predicts password strength from the generator settings.
     Returns a score from 0 (Very Weak) to 4 (Strong).
 
-    This is a rule-based approximation. A real AI system would involve trained ML models.
+    The score is derived from the exact entropy of the settings: the compiled
+    alphabet (after exclusions) and the cost of require_min_char_types and
+    no_repeating_chars for passwords, the wordlist size and the digit/symbol
+    insertion choices for passphrases.
     """
-    score = 0
-    entropy_score = 0  # Represents character set diversity or wordlist size
-
     if is_passphrase:
-        # Passphrase specific logic
-        if num_words >= 5:
-            score += 1
-        if num_words >= 8:
-            score += 1  # Very strong passphrase
-
-        # Load the specific wordlist to get its size for entropy calculation
-        current_wordlist = load_wordlist(wordlist_name)
-        wordlist_size = len(
-            current_wordlist
-        ) if current_wordlist else 1  # Avoid division by zero
-
-        # Base character set for additional chars in passphrase (digits/symbols)
-        base_chars_for_passphrase_extras = 0
-        if include_digits:
-            base_chars_for_passphrase_extras += 10
-        if include_symbols:
-            base_chars_for_passphrase_extras += 32  # Common symbols
-
-        # Logarithmic calculation for entropy based on word length and wordlist size
-        # This is a simplification; actual passphrase entropy is complex.
-        # Entropy = log2(wordlist_size)^num_words + log2(base_chars_for_passphrase_extras) * (num_digits + num_symbols)
-        # Simplified heuristic:
-        if wordlist_size > 1:
-            entropy_score = (num_words * math.log2(wordlist_size)) + (
-                base_chars_for_passphrase_extras / 2)
-        else:
-            entropy_score = (num_words * 5) + (
-                base_chars_for_passphrase_extras / 2
-            )  # Fallback if wordlist is tiny/empty
+        # Wordlist size comes from the shared registry's precomputed metadata
+        try:
+            wordlist_size = get_wordlist(wordlist_name).size
+        except (IOError, ValueError) as e:
+            print(f"Error loading wordlist for AI strength prediction: {e}")
+            wordlist_size = 0
+
+        entropy_score = passphrase_entropy_bits(num_words, wordlist_size,
+                                                include_digits,
+                                                include_symbols,
+                                                capitalization, placement)
 
         # Map entropy score to strength
         if entropy_score < 30:  # Example thresholds
@@ -118,56 +86,33 @@ def predict_strength(
             final_score = 4  # Strong
 
     else:
-        # Character password specific logic
-        char_set_size = 0
-        if custom_character_set:
-            char_set_size = len(set(custom_character_set))
-        else:
-            if include_uppercase:
-                char_set_size += 26
-            if include_lowercase:
-                char_set_size += 26
-            if include_digits:
-                char_set_size += 10
-            if include_symbols:
-                char_set_size += 32  # Common symbols
-
-        # Apply exclusions to character set size (approximation)
-        if exclude_ambiguous:
-            # Estimate reduction due to ambiguous chars (e.g., 10-15 chars)
-            char_set_size = max(1, char_set_size - 10)
-        if exclude_custom_chars:
-            char_set_size = max(1,
-                                char_set_size - len(set(exclude_custom_chars)))
-
-        if char_set_size > 0:
-            # Shannon entropy approximation: length * log2(charset_size)
-            entropy_score = length * math.log2(char_set_size)
-        else:
-            entropy_score = 0  # Should ideally be caught by validation
+        try:
+            policy = compile_policy(
+                length=length,
+                include_uppercase=include_uppercase,
+                include_lowercase=include_lowercase,
+                include_digits=include_digits,
+                include_symbols=include_symbols,
+                exclude_ambiguous=exclude_ambiguous,
+                exclude_custom_chars=exclude_custom_chars,
+                custom_character_set=custom_character_set,
+                require_min_char_types=require_min_char_types,
+                no_repeating_chars=no_repeating_chars)
+            entropy_score = password_entropy_bits(policy)
+        except ValueError:
+            entropy_score = 0  # Settings that can't generate a password
 
         # Adjust score based on entropy
         if entropy_score < 40:  # Example thresholds (adjust as needed)
-            score = 0  # Very Weak
+            final_score = 0  # Very Weak
         elif entropy_score < 60:
-            score = 1  # Weak
+            final_score = 1  # Weak
         elif entropy_score < 80:
-            score = 2  # Fair
+            final_score = 2  # Fair
         elif entropy_score < 100:
-            score = 3  # Good
+            final_score = 3  # Good
         else:
-            score = 4  # Strong
-
-        # NEW: Adjust score based on new password generation rules
-        if require_min_char_types:
-            # This makes the password more robust, so slightly increase perceived strength
-            score = min(4, score + 0.5)  # Add half a point, cap at 4
-        if no_repeating_chars:
-            # Prevents simple patterns, increasing strength
-            score = min(4, score + 0.5)  # Add half a point, cap at 4
-
-        # Convert float score to int for final output
-        final_score = int(score)
+            final_score = 4  # Strong
 
     # Ensure score is within bounds [0, 4]
     return max(0, min(4, final_score))
@@ -202,7 +147,7 @@ if __name__ == "__main__":
         f"4 words, long wordlist: {predict_strength(0, False, False, False, False, False, '', is_passphrase=True, num_words=4, wordlist_name='eff_long_wordlist.txt')}"
     )  # Expected: Medium
     print(
-        f"6 words, short wordlist, with digit/symbol: {predict_strength(0, False, False, False, False, False, '', is_passphrase=True, num_words=6, include_digits=True, include_symbols=True, wordlist_name='eff_short_wordlist.txt')}"
+        f"6 words, short wordlist, with digit/symbol: {predict_strength(0, False, False, True, True, False, '', is_passphrase=True, num_words=6, wordlist_name='eff_short_wordlist.txt')}"
     )  # Expected: Good
     print(
         f"8 words, long wordlist, no digit/symbol: {predict_strength(0, False, False, False, False, False, '', is_passphrase=True, num_words=8, wordlist_name='eff_long_wordlist.txt')}"
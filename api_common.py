@@ -0,0 +1,253 @@
+# api_common.py
+#
+# Request handling shared by the Flask app (app.py) and the ASGI app
+# (asgi_app.py): option parsing and validation, strength assessments, named
+# policy presets, admission control and request metrics, so both deployments
+# speak the same JSON contract and enforce the same limits.
+import functools
+import os
+
+import metrics
+from admission_control import AdmissionController, limits_from_env
+from ai_charset_analyzer import analyze_charset_definition
+from ai_strength_model import predict_strength
+from password_generator import (compile_policy, generate_from_policy,
+                                generate_passphrase, generate_passphrase_batch)
+from policy_presets import PRESETS_ENV, PolicyPresets, Preset
+
+# Upper bound on items produced by a single /generate/batch request
+MAX_BATCH_COUNT = 100000
+# Number of NDJSON lines written to the response per streamed chunk
+BATCH_CHUNK_SIZE = 5000
+
+
+def parse_password_options(data):
+    options = {
+        'length': data.get('length', 12),
+        'include_uppercase': data.get('include_uppercase', True),
+        'include_lowercase': data.get('include_lowercase', True),
+        'include_digits': data.get('include_digits', True),
+        'include_symbols': data.get('include_symbols', True),
+        'exclude_ambiguous': data.get('exclude_ambiguous', False),
+        'exclude_custom_chars': data.get('exclude_custom_chars', ''),
+        'custom_character_set': data.get('custom_character_set', ''),
+        'require_min_char_types': data.get('require_min_char_types', False),
+        'no_repeating_chars': data.get('no_repeating_chars', False),
+        'reject_dictionary_words': data.get('reject_dictionary_words', False),
+        'reject_breached': data.get('reject_breached', False)
+    }
+
+    # Client-side validation for password generation
+    if options['length'] < 6 or options['length'] > 30:
+        raise ValueError(
+            'Password length must be between 6 and 30 characters.')
+
+    # Check if any character type is selected if no custom set
+    if not options['custom_character_set'] and not (
+            options['include_uppercase'] or options['include_lowercase']
+            or options['include_digits'] or options['include_symbols']):
+        raise ValueError(
+            'At least one character type must be selected if no custom character set is provided.'
+        )
+
+    return options
+
+
+def parse_passphrase_options(data):
+    options = {
+        'num_words': data.get('num_words', 4),
+        'separator': data.get('separator', '-'),
+        'include_digit': data.get('include_digit', True),
+        'include_symbol': data.get('include_symbol', True),
+        'wordlist_name': data.get('wordlist_name', 'eff_long_wordlist.txt'),
+        # NEW: Get capitalization and placement from frontend
+        'capitalization': data.get('capitalization', 'none'),
+        'placement': data.get('placement', 'random')
+    }
+
+    # Client-side validation for passphrase generation
+    if options['num_words'] < 2 or options['num_words'] > 10:
+        raise ValueError('Number of words must be between 2 and 10.')
+
+    return options
+
+
+def metric_type(generation_type):
+    # Only known types become label values, so clients can't add series
+    return generation_type if generation_type in ('password',
+                                                  'passphrase') else 'invalid'
+
+
+def count_request(route, generation_type=None, error=None):
+    labels = (('route', route), )
+    if generation_type is not None:
+        labels += (('type', generation_type), )
+    metrics.inc('requests_total', labels)
+    if error is not None:
+        count_error(route, error)
+
+
+def count_error(route, error):
+    # Also used for streams that fail after their request was counted
+    metrics.inc('errors_total',
+                (('route', route), ('error', type(error).__name__)))
+
+
+def password_assessment(options):
+    # Predict strength using our simple AI model
+    with metrics.stage('predict_strength'):
+        ai_strength_score = predict_strength(
+            length=options['length'],
+            include_uppercase=options['include_uppercase'],
+            include_lowercase=options['include_lowercase'],
+            include_digits=options['include_digits'],
+            include_symbols=options['include_symbols'],
+            exclude_ambiguous=options['exclude_ambiguous'],
+            exclude_custom_chars=options['exclude_custom_chars'],
+            custom_character_set=options['custom_character_set'],
+            is_passphrase=False,
+            require_min_char_types=options[
+                'require_min_char_types'],  # Pass to AI for better prediction
+            no_repeating_chars=options[
+                'no_repeating_chars']  # Pass to AI for better prediction
+        )
+
+    # Analyze character set definition using our new AI system
+    with metrics.stage('analyze_charset_definition'):
+        charset_recommendation = analyze_charset_definition(
+            include_uppercase=options['include_uppercase'],
+            include_lowercase=options['include_lowercase'],
+            include_digits=options['include_digits'],
+            include_symbols=options['include_symbols'],
+            exclude_ambiguous=options['exclude_ambiguous'],
+            exclude_custom_chars=options['exclude_custom_chars'],
+            custom_character_set=options['custom_character_set'],
+            no_repeating_chars=options[
+                'no_repeating_chars']  # Pass to AI for better prediction
+        )
+
+    return ai_strength_score, charset_recommendation
+
+
+def passphrase_assessment(options):
+    # Predict strength for passphrase using our simple AI model
+    with metrics.stage('predict_strength'):
+        ai_strength_score = predict_strength(
+            length=0,
+            include_uppercase=False,
+            include_lowercase=False,
+            include_digits=options['include_digit'],
+            include_symbols=options['include_symbol'],
+            exclude_ambiguous=False,
+            exclude_custom_chars='',
+            is_passphrase=True,
+            num_words=options['num_words'],
+            wordlist_name=options[
+                'wordlist_name'],  # Pass to AI for better prediction
+            capitalization=options['capitalization'],
+            placement=options['placement'])
+
+    # For passphrase, a simpler recommendation
+    if not options['include_digit'] and not options[
+            'include_symbol'] and options['num_words'] < 5:
+        charset_recommendation = "Consider adding digits/symbols or more words for a stronger passphrase."
+    else:
+        charset_recommendation = "Passphrase configuration looks good!"
+
+    return ai_strength_score, charset_recommendation
+
+
+def compile_preset(name, spec):
+    # Validates a preset like a request, then pins its compiled form
+    spec = dict(spec)
+    generation_type = spec.pop('type', 'password')
+    max_count = spec.pop('max_count', MAX_BATCH_COUNT)
+    if not isinstance(max_count, int) or isinstance(max_count, bool) \
+            or max_count < 1 or max_count > MAX_BATCH_COUNT:
+        raise ValueError(
+            f'max_count must be an integer between 1 and {MAX_BATCH_COUNT}.')
+
+    if generation_type == 'password':
+        parse = parse_password_options
+    elif generation_type == 'passphrase':
+        parse = parse_passphrase_options
+    else:
+        raise ValueError('Invalid generation type specified.')
+    unknown = set(spec) - set(parse({}))
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}.")
+    options = parse(spec)
+
+    if generation_type == 'password':
+        policy = compile_policy(**options)
+        generate = functools.partial(generate_from_policy, policy)
+        generate_batch = policy.generate_batch
+        ai_strength_score, charset_recommendation = password_assessment(
+            options)
+    else:
+        generate = functools.partial(generate_passphrase, **options)
+        generate_batch = functools.partial(generate_passphrase_batch,
+                                           **options)
+        generate_batch(1)  # Surfaces wordlist errors now, not per request
+        ai_strength_score, charset_recommendation = passphrase_assessment(
+            options)
+    return Preset(name, generation_type, options, generate, generate_batch,
+                  ai_strength_score, charset_recommendation, max_count)
+
+
+# Named presets from PASSWORD_POLICY_PRESETS_PATH (see policy_presets.py)
+POLICY_PRESETS = PolicyPresets(os.environ.get(PRESETS_ENV), compile_preset)
+
+
+def resolve_preset(data):
+    # The preset a request names, or None for a request with its own options
+    name = data.get('policy')
+    if name is None:
+        if POLICY_PRESETS.presets_only:
+            raise ValueError(
+                'This server only generates from named policies; send {"policy": <name>}.'
+            )
+        return None
+    return POLICY_PRESETS.get(name)
+
+
+def request_type(data):
+    # Generation type of a request, looking through a named preset
+    if data.get('policy') is None:
+        return data.get('type', 'password')
+    try:
+        return POLICY_PRESETS.get(data['policy']).type
+    except ValueError:
+        return 'invalid'
+
+
+# Rate and concurrency limits of the generation routes (admission_control.py)
+ADMISSION = AdmissionController(**limits_from_env())
+# Behind a trusted proxy, identify clients by X-Forwarded-For instead
+TRUST_FORWARDED = os.environ.get('ADMISSION_TRUST_FORWARDED', '0') == '1'
+
+
+def client_id(forwarded_for, remote_addr):
+    if TRUST_FORWARDED and forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    return remote_addr or 'unknown'
+
+
+def parse_options(generation_type, data):
+    if generation_type == 'password':
+        return parse_password_options(data)
+    if generation_type == 'passphrase':
+        return parse_passphrase_options(data)
+    raise ValueError('Invalid generation type specified.')
+
+
+def admit(client, preset, generation_type, options, cost=1, batch=False):
+    # Presets get a bucket each, ad-hoc requests one per normalized option
+    # set, so unrelated policies don't share a budget
+    if preset is not None:
+        policy = preset.name
+    elif generation_type == 'password':
+        policy = ('password', ) + compile_policy(**options).key
+    else:
+        policy = ('passphrase', ) + tuple(options.values())
+    return ADMISSION.admit(client, policy, cost, batch)
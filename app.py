@@ -1,182 +1,503 @@
 # app.py
-from flask import Flask, request, jsonify, send_from_directory
+#
+# The Flask app is built by create_app(), which also warms the process up:
+# wordlists, dictionary indexes, default policies and strength caches are
+# loaded before the first request. With `gunicorn --preload 'app:create_app()'`
+# (or `app:app`, built on first access) that happens once in the master and
+# the forked workers share it.
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, send_from_directory
 from flask_cors import CORS
-from password_generator import generate_password, generate_passphrase  # load_wordlist is now handled internally by password_generator
+from password_generator import compile_policy, generate_password, generate_passphrase, generate_passphrase_batch, get_policy_cache_stats
 from ai_strength_model import predict_strength
 from ai_charset_analyzer import analyze_charset_definition
+from password_analyzer import analyze_password
+from blocklist_filter import get_blocklist
+from breach_lookup import get_breach_database
+from dictionary_index import get_dictionary_index
+from password_prefetch import enable_prefetch_from_env, get_prefetcher
+from admission_control import AdmissionRejected
+from api_common import (ADMISSION, BATCH_CHUNK_SIZE, MAX_BATCH_COUNT,
+                        POLICY_PRESETS, admit, client_id, count_error,
+                        count_request, metric_type, parse_options,
+                        parse_passphrase_options, parse_password_options,
+                        passphrase_assessment, password_assessment,
+                        request_type, resolve_preset)
+from static_assets import StaticAssetCache
+from wordlist_registry import BUNDLED_WORDLISTS, get_wordlist, wordlist_exists
+import metrics
+import request_profiler
+import functools
+import json
 import os
+import time
 
-app = Flask(__name__)
-CORS(app)
+api = Blueprint('api', __name__)
+
+# Set PASSWORD_WARMUP=0 to skip the warm-up (faster start, colder first requests)
+WARMUP_ENABLED = os.environ.get('PASSWORD_WARMUP', '1') != '0'
+# Wordlists the passphrase form offers
+WARMUP_WORDLISTS = BUNDLED_WORDLISTS
 
 # Define the directory where your static files (HTML, CSS, JS) are located
 STATIC_DIR = os.path.abspath(os.path.dirname(__file__))
+# Never serve backend sources, compiled wordlists, filters or breach databases
+# from the static route
+DENIED_SUFFIXES = ('.py', '.wlb', '.bloom', '.pwdb')
+# index.html, script.js and style.css, read once and kept gzipped in memory
+STATIC_ASSETS = StaticAssetCache(STATIC_DIR)
+
+
+def _send_static(filename):
+    # Cached front-end files carry ETags and are sent gzipped when accepted;
+    # in debug mode they're reread whenever the file changes
+    asset = STATIC_ASSETS.get(filename, revalidate=current_app.debug)
+    if asset is None:
+        return send_from_directory(STATIC_DIR, filename)
+
+    if asset.gzipped is not None and request.accept_encodings['gzip']:
+        body, etag, encoding = asset.gzipped, asset.gzip_etag, 'gzip'
+    else:
+        body, etag, encoding = asset.data, asset.etag, None
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Always revalidate; an unchanged file then costs a bodiless 304
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 # Route to serve the main HTML file
-@app.route('/')
+@api.route('/')
 def serve_index():
-    return send_from_directory(STATIC_DIR, 'index.html')
+    return _send_static('index.html')
 
 
 # Route to serve static files like CSS and JS
-@app.route('/<path:filename>')
+@api.route('/<path:filename>')
 def serve_static(filename):
     # Prevent serving app.py or other sensitive files
     if filename in [
             'app.py', 'password_generator.py', 'ai_strength_model.py',
             'ai_charset_analyzer.py', 'eff_long_wordlist.txt',
             'eff_short_wordlist.txt', '.replit', 'pyproject.toml'
-    ]:
+    ] or filename.endswith(DENIED_SUFFIXES):
         return "Access Denied", 403
-    return send_from_directory(STATIC_DIR, filename)
+    return _send_static(filename)
 
 
-@app.route('/generate', methods=['POST'])
+def _rejected_response(route, rejection):
+    metrics.inc('rejected_total', (('route', route),
+                                   ('reason', rejection.reason)))
+    return jsonify({'error': str(rejection)}), 429, {
+        'Retry-After': str(rejection.retry_after)
+    }
+
+
+def _profile_label(req):
+    # Profiles are filed per generation type, like the request metrics
+    data = req.get_json(silent=True)
+    if not isinstance(data, dict):
+        return 'invalid'
+    return metric_type(request_type(data))
+
+
+@api.route('/generate', methods=['POST'])
+@request_profiler.profile_view('/generate', request, _profile_label)
 def generate():
+    generation_type = error = ticket = None
     try:
-        data = request.get_json()
-        generation_type = data.get('type', 'password')
-
-        ai_strength_score = 0
-        charset_recommendation = ""
-
-        if generation_type == 'password':
-            length = data.get('length', 12)
-            include_uppercase = data.get('include_uppercase', True)
-            include_lowercase = data.get('include_lowercase', True)
-            include_digits = data.get('include_digits', True)
-            include_symbols = data.get('include_symbols', True)
-            exclude_ambiguous = data.get('exclude_ambiguous', False)
-            exclude_custom_chars = data.get('exclude_custom_chars', '')
-            custom_character_set = data.get('custom_character_set', '')
-            require_min_char_types = data.get('require_min_char_types', False)
-            no_repeating_chars = data.get('no_repeating_chars', False)
-
-            # Client-side validation for password generation
-            if length < 6 or length > 30:
-                raise ValueError(
-                    'Password length must be between 6 and 30 characters.')
-
-            # Check if any character type is selected if no custom set
-            if not custom_character_set and not (
-                    include_uppercase or include_lowercase or include_digits
-                    or include_symbols):
-                raise ValueError(
-                    'At least one character type must be selected if no custom character set is provided.'
-                )
-
-            password = generate_password(
-                length=length,
-                include_uppercase=include_uppercase,
-                include_lowercase=include_lowercase,
-                include_digits=include_digits,
-                include_symbols=include_symbols,
-                exclude_ambiguous=exclude_ambiguous,
-                exclude_custom_chars=exclude_custom_chars,
-                custom_character_set=custom_character_set,
-                require_min_char_types=require_min_char_types,
-                no_repeating_chars=no_repeating_chars)
-
-            # Predict strength using our simple AI model
-            ai_strength_score = predict_strength(
-                length=length,
-                include_uppercase=include_uppercase,
-                include_lowercase=include_lowercase,
-                include_digits=include_digits,
-                include_symbols=include_symbols,
-                exclude_ambiguous=exclude_ambiguous,
-                exclude_custom_chars=exclude_custom_chars,
-                custom_character_set=custom_character_set,
-                is_passphrase=False,
-                require_min_char_types=
-                require_min_char_types,  # Pass to AI for better prediction
-                no_repeating_chars=
-                no_repeating_chars  # Pass to AI for better prediction
-            )
-
-            # Analyze character set definition using our new AI system
-            charset_recommendation = analyze_charset_definition(
-                include_uppercase=include_uppercase,
-                include_lowercase=include_lowercase,
-                include_digits=include_digits,
-                include_symbols=include_symbols,
-                exclude_ambiguous=exclude_ambiguous,
-                exclude_custom_chars=exclude_custom_chars,
-                custom_character_set=custom_character_set,
-                no_repeating_chars=
-                no_repeating_chars  # Pass to AI for better prediction
-            )
-
-            return jsonify({
+        with metrics.stage('parse_request'):
+            data = request.get_json()
+        with metrics.stage('resolve_policy'):
+            preset = resolve_preset(data)
+        generation_type = preset.type if preset else data.get(
+            'type', 'password')
+        options = None
+        if preset is None:
+            with metrics.stage('parse_options'):
+                options = parse_options(generation_type, data)
+        ticket = admit(
+            client_id(request.headers.get('X-Forwarded-For'),
+                       request.remote_addr), preset, generation_type, options)
+
+        if preset is not None:
+            with metrics.stage(f'generate_{generation_type}'):
+                password = preset.generate()
+            ai_strength_score = preset.ai_strength_score
+            charset_recommendation = preset.charset_recommendation
+
+        elif generation_type == 'password':
+            with metrics.stage('generate_password'):
+                password = generate_password(**options)
+            ai_strength_score, charset_recommendation = password_assessment(
+                options)
+
+        else:
+            with metrics.stage('generate_passphrase'):
+                password = generate_passphrase(**options)
+            ai_strength_score, charset_recommendation = passphrase_assessment(
+                options)
+
+        with metrics.stage('serialize'):
+            response = jsonify({
                 'password': password,
                 'ai_strength_score': ai_strength_score,
                 'charset_recommendation': charset_recommendation
             })
+        metrics.inc('items_generated_total', (('type', generation_type), ))
+        return response
 
+    except AdmissionRejected as e:
+        error = e
+        return _rejected_response('/generate', e)
+    except ValueError as e:
+        error = e
+        return jsonify({'error': str(e)}), 400
+    except FileNotFoundError as e:
+        error = e
+        return jsonify({'error': 'Backend error: ' + str(e)}), 500
+    except Exception as e:
+        error = e
+        return jsonify({'error':
+                        'An unexpected error occurred: ' + str(e)}), 500
+    finally:
+        if ticket is not None:
+            ticket.release()
+        count_request('/generate', metric_type(generation_type), error)
+
+
+# Bulk generation: same options as /generate plus a 'count', streamed back as
+# NDJSON. The first line carries the batch-wide strength score and
+# recommendation (they only depend on the options), followed by one
+# {"password": ...} line per generated item.
+@api.route('/generate/batch', methods=['POST'])
+def generate_batch():
+    generation_type = error = ticket = None
+    streaming = False
+    try:
+        with metrics.stage('parse_request'):
+            data = request.get_json()
+        with metrics.stage('resolve_policy'):
+            preset = resolve_preset(data)
+        generation_type = preset.type if preset else data.get(
+            'type', 'password')
+
+        max_count = preset.max_count if preset else MAX_BATCH_COUNT
+        count = data.get('count', 1)
+        if not isinstance(count, int) or isinstance(count, bool) \
+                or count < 1 or count > max_count:
+            raise ValueError(
+                f'Count must be an integer between 1 and {max_count}.')
+
+        options = None
+        if preset is not None:
+            make_items = preset.generate_batch
+            ai_strength_score = preset.ai_strength_score
+            charset_recommendation = preset.charset_recommendation
+        elif generation_type == 'password':
+            with metrics.stage('parse_options'):
+                options = parse_password_options(data)
+                # Compile the policy once and reuse it for every item
+                make_items = compile_policy(**options).generate_batch
+            ai_strength_score, charset_recommendation = password_assessment(
+                options)
         elif generation_type == 'passphrase':
-            num_words = data.get('num_words', 4)
-            separator = data.get('separator', '-')
-            include_digit = data.get('include_digit', True)
-            include_symbol = data.get('include_symbol', True)
-            wordlist_name = data.get('wordlist_name', 'eff_long_wordlist.txt')
-            # NEW: Get capitalization and placement from frontend
-            capitalization = data.get('capitalization', 'none')
-            placement = data.get('placement', 'random')
-
-            # Client-side validation for passphrase generation
-            if num_words < 2 or num_words > 10:
-                raise ValueError('Number of words must be between 2 and 10.')
-
-            passphrase = generate_passphrase(
-                num_words=num_words,
-                separator=separator,
-                include_digit=include_digit,
-                include_symbol=include_symbol,
-                wordlist_name=wordlist_name,
-                capitalization=capitalization,  # NEW: Pass to generator
-                placement=placement  # NEW: Pass to generator
-            )
-
-            # Predict strength for passphrase using our simple AI model
-            ai_strength_score = predict_strength(
-                length=0,
-                include_uppercase=False,
-                include_lowercase=False,
-                include_digits=include_digit,
-                include_symbols=include_symbol,
-                exclude_ambiguous=False,
-                exclude_custom_chars='',
-                is_passphrase=True,
-                num_words=num_words,
-                wordlist_name=wordlist_name  # Pass to AI for better prediction
-            )
-
-            # For passphrase, a simpler recommendation
-            if not include_digit and not include_symbol and num_words < 5:
-                charset_recommendation = "Consider adding digits/symbols or more words for a stronger passphrase."
-            else:
-                charset_recommendation = "Passphrase configuration looks good!"
-
-            return jsonify({
-                'password': passphrase,
-                'ai_strength_score': ai_strength_score,
-                'charset_recommendation': charset_recommendation
-            })
+            with metrics.stage('parse_options'):
+                options = parse_passphrase_options(data)
+            make_items = functools.partial(generate_passphrase_batch,
+                                           **options)
 
+            ai_strength_score, charset_recommendation = passphrase_assessment(
+                options)
         else:
-            return jsonify({'error':
-                            'Invalid generation type specified.'}), 400
+            raise ValueError('Invalid generation type specified.')
+
+        # Charged by items to the policy's batch bucket; the slot is held
+        # until the stream is closed
+        ticket = admit(client_id(request.headers.get('X-Forwarded-For'),
+                                   request.remote_addr),
+                        preset,
+                        generation_type,
+                        options,
+                        cost=count,
+                        batch=True)
+
+        # Generate the first chunk eagerly so option errors still surface as
+        # a regular JSON error response instead of a broken stream.
+        with metrics.stage('generate_batch_chunk'):
+            first_chunk = make_items(min(count, BATCH_CHUNK_SIZE))
+        streaming = True
 
+    except AdmissionRejected as e:
+        error = e
+        return _rejected_response('/generate/batch', e)
     except ValueError as e:
+        error = e
         return jsonify({'error': str(e)}), 400
     except FileNotFoundError as e:
+        error = e
         return jsonify({'error': 'Backend error: ' + str(e)}), 500
     except Exception as e:
+        error = e
         return jsonify({'error':
                         'An unexpected error occurred: ' + str(e)}), 500
+    finally:
+        if ticket is not None and not streaming:
+            ticket.release()
+        count_request('/generate/batch', metric_type(generation_type),
+                       error)
+
+    def stream():
+        yield json.dumps({
+            'count': count,
+            'ai_strength_score': ai_strength_score,
+            'charset_recommendation': charset_recommendation
+        }) + '\n'
+        chunk = first_chunk
+        remaining = count - len(chunk)
+        while True:
+            # Flush in chunks rather than one tiny write per item
+            with metrics.stage('serialize'):
+                lines = ''.join(
+                    json.dumps({'password': item}) + '\n' for item in chunk)
+            metrics.inc('items_generated_total', (('type', generation_type), ),
+                        len(chunk))
+            yield lines
+            if remaining <= 0:
+                break
+            try:
+                with metrics.stage('generate_batch_chunk'):
+                    chunk = make_items(min(remaining, BATCH_CHUNK_SIZE))
+            except Exception as e:
+                # The request was already counted as served
+                count_error('/generate/batch', e)
+                raise
+            remaining -= len(chunk)
+
+    response = Response(stream(), mimetype='application/x-ndjson')
+    response.call_on_close(ticket.release)
+    return response
+
+
+# Score a concrete, user-supplied password (not generator settings)
+@api.route('/analyze', methods=['POST'])
+def analyze():
+    error = None
+    try:
+        with metrics.stage('parse_request'):
+            data = request.get_json()
+        password = data.get('password')
+        if not isinstance(password, str):
+            raise ValueError('A password string is required.')
+        with metrics.stage('analyze_password'):
+            result = analyze_password(password)
+        with metrics.stage('serialize'):
+            return jsonify(result)
+
+    except ValueError as e:
+        error = e
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        error = e
+        return jsonify({'error':
+                        'An unexpected error occurred: ' + str(e)}), 500
+    finally:
+        count_request('/analyze', error=error)
+
+
+# Aggregated request profiles (see request_profiler.py). Only answers
+# requests carrying the admin token; without one configured it stays hidden.
+@api.route('/admin/profiles', methods=['GET', 'DELETE'])
+def profiles():
+    if not request_profiler.is_admin(request.headers):
+        return jsonify({'error': 'Not found.'}), 404
+    if request.method == 'DELETE':
+        request_profiler.reset()
+        return jsonify({'reset': True})
+    return jsonify(request_profiler.summary())
+
+
+@api.route('/admin/profiles/download', methods=['GET'])
+def download_profile():
+    if not request_profiler.is_admin(request.headers):
+        return jsonify({'error': 'Not found.'}), 404
+    route = request.args.get('route', '/generate')
+    generation_type = request.args.get('type', 'password')
+    output_format = request.args.get('format', 'pstats')
+
+    if output_format == 'pstats':
+        data = request_profiler.export_pstats(route, generation_type)
+        mimetype, extension = 'application/octet-stream', 'prof'
+    elif output_format == 'collapsed':
+        data = request_profiler.export_collapsed(route, generation_type)
+        mimetype, extension = 'text/plain', 'folded'
+    else:
+        return jsonify({'error':
+                        "Format must be 'pstats' or 'collapsed'."}), 400
+    if data is None:
+        return jsonify({'error': 'No profile recorded for that route and type.'
+                        }), 404
+
+    filename = f"{route.strip('/').replace('/', '-')}-{generation_type}.{extension}"
+    return Response(
+        data,
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
+# Current admission limits and counters; PUT a JSON object with any of
+# admission_control.LIMIT_NAMES to change them on the fly. Admin token only.
+@api.route('/admin/limits', methods=['GET', 'PUT'])
+def admission_limits():
+    if not request_profiler.is_admin(request.headers):
+        return jsonify({'error': 'Not found.'}), 404
+    if request.method == 'PUT':
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object of limits.'}), 400
+        try:
+            ADMISSION.configure(**data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    return jsonify(ADMISSION.stats())
+
+
+# The named policies clients can send as {"policy": <name>}
+@api.route('/policies', methods=['GET'])
+def policies():
+    return jsonify({
+        'presets_only': POLICY_PRESETS.presets_only,
+        'policies': POLICY_PRESETS.describe()
+    })
+
+
+# Prometheus scrape target: per-stage latency histograms, request/error/item
+# counters and cache and wordlist registry statistics
+@api.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+# Hit/miss/eviction counters of the per-process caches behind /generate
+@api.route('/stats/caches', methods=['GET'])
+def cache_stats():
+    prefetcher = get_prefetcher()
+    return jsonify({
+        'policy': get_policy_cache_stats(),
+        'strength': predict_strength.cache_stats(),
+        'charset': analyze_charset_definition.cache_stats(),
+        'prefetch': prefetcher.stats() if prefetcher is not None else None,
+        'static': STATIC_ASSETS.stats()
+    })
+
+
+def warm_up():
+    """
+    Loads and primes everything the first requests would otherwise pay for:
+    the wordlists, the dictionary indexes behind reject_dictionary_words and
+    /analyze, the compiled policies and strength assessments of the form's
+    default options, and the numpy engine behind batch generation. Returns
+    the seconds spent per step.
+    """
+    timings = {}
+    # A missing file would only warm up the dummy fallback (with a warning)
+    wordlists = [name for name in WARMUP_WORDLISTS if wordlist_exists(name)]
+
+    def step(name, func):
+        started = time.perf_counter()
+        func()
+        timings[name] = time.perf_counter() - started
+
+    def load_wordlists():
+        for name in wordlists:
+            get_wordlist(name)
+
+    def build_indexes():
+        get_dictionary_index()
+        analyze_password('warm-up')  # Builds the common-password index
+
+    def prime_passwords():
+        # The default options at every length the form allows
+        for length in range(6, 31):
+            options = parse_password_options({'length': length})
+            compile_policy(**options)
+            password_assessment(options)
+        # Imports the vectorized engine (and numpy) once, before any fork
+        compile_policy().generate_batch(1)
+
+    def prime_passphrases():
+        for wordlist_name in wordlists:
+            # Builds the word variant tables the passphrase engine draws from
+            generate_passphrase_batch(1, wordlist_name=wordlist_name)
+            for num_words in range(2, 11):
+                passphrase_assessment(
+                    parse_passphrase_options({
+                        'num_words': num_words,
+                        'wordlist_name': wordlist_name
+                    }))
+
+    step('filters', lambda: (get_blocklist(), get_breach_database()))
+    step('wordlists', load_wordlists)
+    step('indexes', build_indexes)
+    step('password_policies', prime_passwords)
+    step('passphrase_policies', prime_passphrases)
+    # The assessments above went through the request stage timers
+    metrics.reset()
+    return timings
+
+
+def init_backend(warm=None):
+    """
+    Per-process setup shared by the Flask and ASGI apps. Returns the warm-up
+    timings, or None when the warm-up is disabled.
+    """
+    # Map the common-password blocklist (if configured) before the first request,
+    # so a bad PASSWORD_BLOCKLIST_PATH fails at startup instead of mid-request
+    get_blocklist()
+    # Optional background buffers of ready passwords for the hottest policies
+    enable_prefetch_from_env()
+    # Invalid presets fail the start; later edits are picked up on the fly
+    POLICY_PRESETS.load()
+    if warm is None:
+        warm = WARMUP_ENABLED
+    if warm:
+        return warm_up()
+    return None
+
+
+def create_app(warm=None):
+    """
+    Builds the Flask app. `warm` overrides PASSWORD_WARMUP; the warm-up
+    timings end up in app.config['WARMUP_TIMINGS'].
+    """
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(api)
+    STATIC_ASSETS.preload()
+    app.config['WARMUP_TIMINGS'] = init_backend(warm)
+    return app
+
+
+_APP = None
+
+
+def __getattr__(name):
+    # `gunicorn app:app` and `from app import app` build the app on first
+    # access, so importing this module for its helpers stays cheap
+    global _APP
+    if name == 'app':
+        if _APP is None:
+            _APP = create_app()
+        return _APP
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # IMPORTANT: Ensure Flask runs on port 8080 for Replit deployment
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8080, debug=True)
+    create_app().run(host='0.0.0.0', port=8080, debug=True)
@@ -0,0 +1,381 @@
+# asgi_app.py
+#
+# ASGI variant of the generation API, served on an asyncio event loop:
+#
+#   uvicorn asgi_app:app --host 0.0.0.0 --port 8080
+#
+# It speaks the same JSON contract as app.py (request options, response
+# fields, error bodies and CORS headers), so script.js can point at either
+# deployment. Single-item requests are cheap enough to run on the loop; bulk
+# work runs on a bounded thread pool so the loop keeps accepting requests
+# while batches are being generated.
+import asyncio
+import functools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from admission_control import AdmissionRejected
+from api_common import (BATCH_CHUNK_SIZE, MAX_BATCH_COUNT, POLICY_PRESETS,
+                        admit, client_id, count_error, count_request,
+                        metric_type, parse_options, parse_passphrase_options,
+                        parse_password_options, passphrase_assessment,
+                        password_assessment, request_type, resolve_preset)
+from app import init_backend
+from password_analyzer import analyze_password
+from password_generator import (compile_policy, generate_passphrase,
+                                generate_passphrase_batch, generate_password)
+
+# Threads that run bulk generation; each one draws from its own entropy pool
+GENERATION_WORKERS = int(
+    os.environ.get('ASGI_GENERATION_WORKERS', min(8, os.cpu_count() or 1)))
+# Chunks allowed to wait for a worker before new batch requests queue up
+MAX_PENDING_CHUNKS = GENERATION_WORKERS * 4
+# Request bodies larger than this are rejected before being parsed
+MAX_BODY_SIZE = 64 * 1024
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=GENERATION_WORKERS,
+                               thread_name_prefix='generation')
+_PENDING = None  # Semaphore bounding the executor queue, bound to the loop
+
+# flask_cors defaults: any origin, preflights answered for every route
+_CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+]
+_PREFLIGHT_HEADERS = _CORS_HEADERS + [
+    (b'access-control-allow-methods',
+     b'DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT'),
+]
+
+
+async def _run_bulk(func, *args):
+    # Runs CPU-bound work off the loop, never queueing more than the bound
+    global _PENDING
+    if _PENDING is None:
+        _PENDING = asyncio.Semaphore(MAX_PENDING_CHUNKS)
+    async with _PENDING:
+        return await asyncio.get_running_loop().run_in_executor(
+            _EXECUTOR, func, *args)
+
+
+async def _read_json(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionResetError('Client disconnected.')
+        body.extend(message.get('body', b''))
+        if len(body) > MAX_BODY_SIZE:
+            raise ValueError('Request body is too large.')
+        if not message.get('more_body'):
+            break
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError('Request body must be a JSON object.')
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object.')
+    return data
+
+
+async def _send_json(send, payload, status=200):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': _CORS_HEADERS + [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_error(send, error, route=None):
+    if isinstance(error, AdmissionRejected):
+        metrics.inc('rejected_total', (('route', route),
+                                       ('reason', error.reason)))
+        body = json.dumps({'error': str(error)}).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 429,
+            'headers': _CORS_HEADERS + [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('ascii')),
+                (b'retry-after', str(error.retry_after).encode('ascii')),
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+    elif isinstance(error, ValueError):
+        await _send_json(send, {'error': str(error)}, 400)
+    elif isinstance(error, FileNotFoundError):
+        await _send_json(send, {'error': 'Backend error: ' + str(error)}, 500)
+    else:
+        await _send_json(send,
+                         {'error': 'An unexpected error occurred: ' + str(error)},
+                         500)
+
+
+async def generate(data, send, client):
+    preset = resolve_preset(data)
+    generation_type = preset.type if preset else data.get('type', 'password')
+    options = None if preset else parse_options(generation_type, data)
+    ticket = admit(client, preset, generation_type, options)
+    try:
+        await _generate(send, preset, generation_type, options)
+    finally:
+        ticket.release()
+
+
+async def _generate(send, preset, generation_type, options):
+    if preset is not None:
+        with metrics.stage(f'generate_{generation_type}'):
+            password = preset.generate()
+        ai_strength_score = preset.ai_strength_score
+        charset_recommendation = preset.charset_recommendation
+
+    elif generation_type == 'password':
+        with metrics.stage('generate_password'):
+            password = generate_password(**options)
+        ai_strength_score, charset_recommendation = password_assessment(
+            options)
+
+    else:
+        with metrics.stage('generate_passphrase'):
+            password = generate_passphrase(**options)
+        ai_strength_score, charset_recommendation = passphrase_assessment(
+            options)
+
+    metrics.inc('items_generated_total', (('type', generation_type), ))
+    await _send_json(
+        send, {
+            'password': password,
+            'ai_strength_score': ai_strength_score,
+            'charset_recommendation': charset_recommendation
+        })
+
+
+def _passphrase_items(options, n):
+    return generate_passphrase_batch(n, **options)
+
+
+def _ndjson_lines(items):
+    return ''.join(json.dumps({'password': item}) + '\n'
+                   for item in items).encode('utf-8')
+
+
+async def generate_batch(data, send, disconnected, client):
+    # Same NDJSON stream as app.py: a summary line, then one line per item
+    preset = resolve_preset(data)
+    generation_type = preset.type if preset else data.get('type', 'password')
+
+    max_count = preset.max_count if preset else MAX_BATCH_COUNT
+    count = data.get('count', 1)
+    if not isinstance(count, int) or isinstance(count, bool) \
+            or count < 1 or count > max_count:
+        raise ValueError(f'Count must be an integer between 1 and {max_count}.')
+
+    options = None
+    if preset is not None:
+        make_items = preset.generate_batch
+        ai_strength_score = preset.ai_strength_score
+        charset_recommendation = preset.charset_recommendation
+    elif generation_type == 'password':
+        options = parse_password_options(data)
+        # Compile the policy once and reuse it for every item
+        make_items = compile_policy(**options).generate_batch
+        ai_strength_score, charset_recommendation = password_assessment(
+            options)
+    elif generation_type == 'passphrase':
+        options = parse_passphrase_options(data)
+        make_items = functools.partial(_passphrase_items, options)
+        ai_strength_score, charset_recommendation = passphrase_assessment(
+            options)
+    else:
+        raise ValueError('Invalid generation type specified.')
+
+    # Charged by items to the policy's batch bucket; the slot is held until
+    # the stream ends
+    ticket = admit(client, preset, generation_type, options, cost=count,
+                    batch=True)
+    try:
+        await _stream_batch(send, disconnected, make_items, count,
+                            generation_type, ai_strength_score,
+                            charset_recommendation)
+    finally:
+        ticket.release()
+
+
+async def _stream_batch(send, disconnected, make_items, count, generation_type,
+                        ai_strength_score, charset_recommendation):
+    # The first chunk is generated before the headers go out, so option
+    # errors still surface as a regular JSON error response.
+    chunk = await _run_bulk(make_items, min(count, BATCH_CHUNK_SIZE))
+    remaining = count - len(chunk)
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': _CORS_HEADERS + [(b'content-type', b'application/x-ndjson')]
+    })
+    await send({
+        'type': 'http.response.body',
+        'body': (json.dumps({
+            'count': count,
+            'ai_strength_score': ai_strength_score,
+            'charset_recommendation': charset_recommendation
+        }) + '\n').encode('utf-8'),
+        'more_body': True
+    })
+    next_chunk = None
+    try:
+        while True:
+            # Generate the next chunk while this one is being sent
+            next_chunk = None
+            if remaining > 0 and not disconnected.is_set():
+                size = min(remaining, BATCH_CHUNK_SIZE)
+                next_chunk = asyncio.ensure_future(_run_bulk(make_items, size))
+                remaining -= size
+            metrics.inc('items_generated_total', (('type', generation_type), ),
+                        len(chunk))
+            await send({
+                'type': 'http.response.body',
+                'body': _ndjson_lines(chunk),
+                'more_body': next_chunk is not None
+            })
+            if next_chunk is None:
+                break
+            chunk = await next_chunk
+    except Exception as e:
+        # Headers are already out, so the stream just ends early (as it
+        # does when the Flask generator fails mid-response); the request
+        # itself is counted as served, so record the failure here
+        count_error('/generate/batch', e)
+        if next_chunk is not None:
+            next_chunk.cancel()
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+async def analyze(data, send):
+    password = data.get('password')
+    if not isinstance(password, str):
+        raise ValueError('A password string is required.')
+    await _send_json(send, analyze_password(password))
+
+
+_ROUTES = {
+    '/generate': generate,
+    '/generate/batch': generate_batch,
+    '/analyze': analyze,
+}
+
+
+async def _watch_disconnect(receive, disconnected):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            disconnected.set()
+            return
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Same setup and warm-up as the Flask app, once per worker
+            init_backend()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    if scope['path'] == '/metrics' and scope['method'] == 'GET':
+        body = metrics.render().encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', metrics.CONTENT_TYPE.encode('ascii'))]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+        return
+
+    if scope['path'] == '/policies' and scope['method'] == 'GET':
+        await _send_json(
+            send, {
+                'presets_only': POLICY_PRESETS.presets_only,
+                'policies': POLICY_PRESETS.describe()
+            })
+        return
+
+    handler = _ROUTES.get(scope['path'])
+    if handler is None:
+        await _send_json(send, {'error': 'Not found.'}, 404)
+        return
+    if scope['method'] == 'OPTIONS':
+        # Like flask_cors, allow whichever headers the preflight asks for
+        requested = dict(scope['headers']).get(
+            b'access-control-request-headers')
+        headers = list(_PREFLIGHT_HEADERS)
+        if requested:
+            headers.append((b'access-control-allow-headers', requested))
+        await send({
+            'type': 'http.response.start',
+            'status': 204,
+            'headers': headers
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    if scope['method'] != 'POST':
+        await _send_json(send, {'error': 'Method not allowed.'}, 405)
+        return
+
+    try:
+        with metrics.stage('parse_request'):
+            data = await _read_json(receive)
+    except ConnectionResetError:
+        return
+    except ValueError as e:
+        count_request(scope['path'],
+                       None if handler is analyze else 'invalid', e)
+        await _send_error(send, e)
+        return
+
+    error = None
+    disconnected = asyncio.Event()
+    watcher = asyncio.ensure_future(_watch_disconnect(receive, disconnected))
+    try:
+        headers = dict(scope['headers'])
+        client = client_id(
+            headers.get(b'x-forwarded-for', b'').decode('latin-1'),
+            (scope.get('client') or (None, ))[0])
+        if handler is generate_batch:
+            await handler(data, send, disconnected, client)
+        elif handler is generate:
+            await handler(data, send, client)
+        else:
+            await handler(data, send)
+    except Exception as e:
+        error = e
+        await _send_error(send, e, scope['path'])
+    finally:
+        watcher.cancel()
+        generation_type = None
+        if handler is not analyze:
+            generation_type = metric_type(request_type(data))
+        count_request(scope['path'], generation_type, error)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run('asgi_app:app', host='0.0.0.0', port=8080)
@@ -0,0 +1,118 @@
+# binary_wordlist.py
+#
+# Compiled wordlist format, loaded with mmap so every worker process shares a
+# single page-cache copy and picking a word is an index lookup.
+#
+# Layout (all integers little-endian):
+#   header   magic b'PGWL', version (u16), header size (u16), word count
+#            (u32), min and max word length in characters (u32 each),
+#            reserved (u32)
+#   offsets  word count + 1 u32 byte offsets into the blob
+#   blob     the UTF-8 encoded words, back to back
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+
+MAGIC = b'PGWL'
+VERSION = 1
+COMPILED_SUFFIX = '.wlb'
+
+_HEADER = struct.Struct('<4sHHIIII')
+_OFFSET = struct.Struct('<I')
+_OFFSET_PAIR = struct.Struct('<II')
+
+
+def compiled_path_for(text_path):
+    base, _ = os.path.splitext(text_path)
+    return base + COMPILED_SUFFIX
+
+
+def compile_wordlist(text_path, output_path=None):
+    """
+    Converts a one-word-per-line text wordlist into the binary format.
+    Blank lines and surrounding whitespace are dropped, the same way the
+    text loader does. Returns the path that was written.
+    """
+    output_path = output_path or compiled_path_for(text_path)
+    with open(text_path, 'r', encoding='utf-8') as f:
+        words = [line.strip() for line in f if line.strip()]
+    if not words:
+        raise ValueError(
+            f"Wordlist file '{text_path}' is empty or could not be read.")
+
+    encoded = [word.encode('utf-8') for word in words]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    if offsets[-1] >= 1 << 32:
+        raise ValueError("Wordlist is too large for the binary format.")
+
+    lengths = [len(word) for word in words]
+    header = _HEADER.pack(MAGIC, VERSION, _HEADER.size, len(words),
+                          min(lengths), max(lengths), 0)
+
+    # Write to a temporary file and rename, so readers never map a partial file
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(b''.join(encoded))
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+class MappedWordlist(Sequence):
+    """
+    Read-only, memory-mapped view of a compiled wordlist. Behaves like a
+    list of strings; words are decoded from the mapping on access.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"'{path}' is not a compiled wordlist.")
+        (magic, version, header_size, self._count, self.min_word_length,
+         self.max_word_length, _) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a compiled wordlist.")
+
+        self._offsets_start = header_size
+        self._blob_start = header_size + _OFFSET.size * (self._count + 1)
+        blob_size = _OFFSET.unpack_from(self._mm,
+                                        self._blob_start - _OFFSET.size)[0]
+        if len(self._mm) < self._blob_start + blob_size:
+            raise ValueError(f"Compiled wordlist '{path}' is truncated.")
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Wordlist index out of range.")
+        start, end = _OFFSET_PAIR.unpack_from(
+            self._mm, self._offsets_start + _OFFSET.size * index)
+        return self._mm[self._blob_start + start:self._blob_start +
+                        end].decode('utf-8')
+
+    def close(self):
+        self._mm.close()
+
+    def __repr__(self):
+        return f"MappedWordlist({self.path!r}, size={self._count})"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python binary_wordlist.py WORDLIST.txt [OUTPUT.wlb]")
+        sys.exit(2)
+    written = compile_wordlist(*sys.argv[1:])
+    print(f"Wrote {len(MappedWordlist(written))} words to {written}")
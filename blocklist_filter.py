@@ -0,0 +1,231 @@
+# blocklist_filter.py
+#
+# Bloom filter over a local blocklist of common passwords. The generators
+# check every password they produce against it and draw again on a hit, so
+# short policies never hand out "password1" or "qwerty". A false positive
+# only costs one extra draw, which is why a compact probabilistic filter is
+# enough here.
+#
+# Binary layout (all integers little-endian):
+#   header   magic b'PGBF', version (u16), header size (u16), hash count
+#            (u32), bit count (u64), entry count (u64)
+#   bits     the filter's bit array, bit i is (byte i // 8) >> (i % 8) & 1
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+
+MAGIC = b'PGBF'
+VERSION = 1
+COMPILED_SUFFIX = '.bloom'
+
+# Path of the compiled filter; the blocklist is disabled when unset
+BLOCKLIST_ENV = 'PASSWORD_BLOCKLIST_PATH'
+
+# Roughly 9.6 bits (1.2 bytes) per entry; 0.05 needs 6.2 bits per entry
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+_HEADER = struct.Struct('<4sHHIQQ')
+_MASK64 = (1 << 64) - 1
+_BUILD_CHUNK = 100000
+
+
+def filter_parameters(entry_count, false_positive_rate):
+    """Returns the (bit count, hash count) that reach the target rate."""
+    if not 0 < false_positive_rate < 1:
+        raise ValueError("False-positive rate must be between 0 and 1.")
+    entry_count = max(entry_count, 1)
+    bits = -entry_count * math.log(false_positive_rate) / math.log(2)**2
+    bit_count = max(64, math.ceil(bits / 8) * 8)
+    hash_count = max(1, round(bit_count / entry_count * math.log(2)))
+    return bit_count, hash_count
+
+
+def _hash_pair(password):
+    # Two 64-bit hashes; probe i is bit (h1 + i * h2) mod 2**64 mod m
+    digest = hashlib.blake2b(password.encode('utf-8'), digest_size=16).digest()
+    return (int.from_bytes(digest[:8], 'little'),
+            int.from_bytes(digest[8:], 'little') | 1)
+
+
+def _read_entries(text_path):
+    with open(text_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line:
+                yield line
+
+
+def _set_bits_python(bits, passwords, bit_count, hash_count):
+    for password in passwords:
+        h1, h2 = _hash_pair(password)
+        for i in range(hash_count):
+            bit = ((h1 + i * h2) & _MASK64) % bit_count
+            bits[bit >> 3] |= 1 << (bit & 7)
+
+
+def _numpy():
+    # Deferred so serving a filter never pays for importing numpy
+    try:
+        import numpy
+    except ImportError:  # numpy is optional; filters are then built bit by bit
+        return None
+    return numpy
+
+
+def _set_bits_numpy(bits, passwords, bit_count, hash_count):
+    np = _numpy()
+    digests = b''.join(
+        hashlib.blake2b(password.encode('utf-8'), digest_size=16).digest()
+        for password in passwords)
+    pairs = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+    h1 = pairs[:, 0].astype(np.uint64)
+    h2 = pairs[:, 1] | np.uint64(1)
+    # uint64 arithmetic wraps exactly like the mask in the scalar path
+    probes = np.arange(hash_count, dtype=np.uint64)
+    positions = (h1[:, None] + probes[None, :] * h2[:, None]) % np.uint64(
+        bit_count)
+    positions = positions.ravel()
+    np.bitwise_or.at(bits, (positions >> np.uint64(3)).astype(np.intp),
+                     (np.uint8(1) << (positions & np.uint64(7)).astype(
+                         np.uint8)))
+
+
+def compile_blocklist(text_path, output_path=None,
+                      false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+    """
+    Builds a Bloom filter from a one-password-per-line blocklist and writes
+    it next to the text file (or to `output_path`). Lines are taken as-is,
+    apart from the line break, since passwords may contain spaces. Returns
+    the path that was written.
+    """
+    output_path = output_path or os.path.splitext(text_path)[0] + COMPILED_SUFFIX
+    entry_count = sum(1 for _ in _read_entries(text_path))
+    if not entry_count:
+        raise ValueError(f"Blocklist '{text_path}' is empty.")
+    bit_count, hash_count = filter_parameters(entry_count, false_positive_rate)
+
+    np = _numpy()
+    if np is not None:
+        bits = np.zeros(bit_count // 8, dtype=np.uint8)
+        set_bits = _set_bits_numpy
+    else:
+        bits = bytearray(bit_count // 8)
+        set_bits = _set_bits_python
+
+    chunk = []
+    for password in _read_entries(text_path):
+        chunk.append(password)
+        if len(chunk) == _BUILD_CHUNK:
+            set_bits(bits, chunk, bit_count, hash_count)
+            chunk = []
+    if chunk:
+        set_bits(bits, chunk, bit_count, hash_count)
+
+    # Write to a temporary file and rename, so readers never map a partial file
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(
+            _HEADER.pack(MAGIC, VERSION, _HEADER.size, hash_count, bit_count,
+                         entry_count))
+        f.write(bytes(bits))
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+class BlocklistFilter:
+    """
+    Read-only, memory-mapped Bloom filter. `password in blocklist` is True
+    for every blocklisted password and, at the configured rate, for a few
+    that aren't.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"'{path}' is not a blocklist filter.")
+        (magic, version, header_size, self.hash_count, self.bit_count,
+         self.entry_count) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a blocklist filter.")
+        if not self.bit_count or not self.hash_count:
+            raise ValueError(f"Blocklist filter '{path}' is empty.")
+        self._bits_start = header_size
+        if len(self._mm) < header_size + self.bit_count // 8:
+            raise ValueError(f"Blocklist filter '{path}' is truncated.")
+
+    def __len__(self):
+        return self.entry_count
+
+    @property
+    def false_positive_rate(self):
+        """Expected false-positive rate for the number of entries stored."""
+        filled = 1 - math.exp(-self.hash_count * self.entry_count /
+                              self.bit_count)
+        return filled**self.hash_count
+
+    def __contains__(self, password):
+        h1, h2 = _hash_pair(password)
+        mm = self._mm
+        start = self._bits_start
+        bit_count = self.bit_count
+        for i in range(self.hash_count):
+            bit = ((h1 + i * h2) & _MASK64) % bit_count
+            if not mm[start + (bit >> 3)] >> (bit & 7) & 1:
+                return False
+        return True
+
+    def close(self):
+        self._mm.close()
+
+
+_BLOCKLIST = None
+_BLOCKLIST_LOADED = False
+_BLOCKLIST_LOCK = threading.Lock()
+
+
+def get_blocklist():
+    """
+    Returns the BlocklistFilter configured through PASSWORD_BLOCKLIST_PATH,
+    mapped once per process, or None when no blocklist is configured.
+    """
+    global _BLOCKLIST, _BLOCKLIST_LOADED
+    if not _BLOCKLIST_LOADED:
+        with _BLOCKLIST_LOCK:
+            if not _BLOCKLIST_LOADED:
+                path = os.environ.get(BLOCKLIST_ENV)
+                _BLOCKLIST = BlocklistFilter(path) if path else None
+                _BLOCKLIST_LOADED = True
+    return _BLOCKLIST
+
+
+def is_blocklisted(password):
+    """True if the configured blocklist (if any) contains `password`."""
+    blocklist = get_blocklist()
+    return blocklist is not None and password in blocklist
+
+
+if __name__ == "__main__":
+    if len(sys.argv) in (2, 3, 4) and sys.argv[1] != 'check':
+        rate = float(sys.argv[3]) if len(sys.argv) == 4 else (
+            DEFAULT_FALSE_POSITIVE_RATE)
+        written = compile_blocklist(sys.argv[1],
+                                    sys.argv[2] if len(sys.argv) > 2 else None,
+                                    rate)
+        compiled = BlocklistFilter(written)
+        print(f"Wrote {written}: {len(compiled):,} entries, "
+              f"{compiled.bit_count // 8:,} bytes, {compiled.hash_count} "
+              f"probes, ~{compiled.false_positive_rate:.3%} false positives")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'check':
+        print(sys.argv[3] in BlocklistFilter(sys.argv[2]))
+    else:
+        print("Usage: python blocklist_filter.py BLOCKLIST.txt "
+              "[OUTPUT.bloom [FALSE_POSITIVE_RATE]]\n"
+              "       python blocklist_filter.py check FILTER.bloom PASSWORD")
+        sys.exit(2)
@@ -0,0 +1,111 @@
+# bounded_cache.py
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel returned by BoundedLRUCache.get() when a key is not cached
+MISSING = object()
+
+
+class BoundedLRUCache:
+    """
+    A small thread-safe LRU cache with a fixed number of entries and an
+    optional time-to-live (in seconds) per entry. Keeps hit/miss/eviction
+    counters so callers can check the cache is doing its job.
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache TTL must be positive.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, expiry time or None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)  # Drop least recently used
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+def memoize(maxsize=256, ttl=None, key=None):
+    """
+    Decorator caching a pure function's results in a BoundedLRUCache.
+
+    `key` is called with the function's arguments and returns the cache key,
+    which lets callers normalize equivalent arguments onto one entry; by
+    default the positional and keyword arguments are used as they are.
+    Exceptions are not cached. The wrapper exposes `cache`, `cache_stats()`
+    and `cache_clear()`.
+    """
+
+    def decorator(func):
+        cache = BoundedLRUCache(maxsize=maxsize, ttl=ttl)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if key is not None:
+                cache_key = key(*args, **kwargs)
+            else:
+                cache_key = (args, tuple(sorted(kwargs.items())))
+            value = cache.get(cache_key)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                cache.put(cache_key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_stats = cache.stats
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,204 @@
+# breach_lookup.py
+#
+# Offline lookup of known-breached passwords against a locally stored dump of
+# SHA-1 hashes (the "ordered by hash" download from Have I Been Pwned, one
+# "HASH:COUNT" line per password). The text dump is converted once into a
+# compact binary file that is memory-mapped and binary searched, so a check
+# touches a handful of pages instead of loading gigabytes into RAM.
+#
+# Binary layout (all integers little-endian):
+#   header   magic b'PGBH', version (u16), header size (u16), flags (u32),
+#            record count (u64)
+#   index    with FLAG_PREFIX_INDEX: 65537 u64 record positions, one per
+#            leading two hash bytes, narrowing every search to one bucket
+#   records  sorted 24-byte records: 20-byte SHA-1 digest + u32 count
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+
+MAGIC = b'PGBH'
+VERSION = 1
+FLAG_PREFIX_INDEX = 1
+
+# Path of the converted database; breach checks are disabled when unset
+BREACH_DB_ENV = 'BREACHED_PASSWORDS_PATH'
+# Suffix of converted databases; the web app refuses to serve these files
+DATABASE_SUFFIX = '.pwdb'
+
+_HEADER = struct.Struct('<4sHHIQ')
+_RECORD = struct.Struct('<20sI')
+_INDEX_ENTRY = struct.Struct('<Q')
+_PREFIX_BUCKETS = 1 << 16
+_INDEX_SIZE = _INDEX_ENTRY.size * (_PREFIX_BUCKETS + 1)
+DIGEST_SIZE = 20
+
+
+def convert_dump(text_path, output_path=None, prefix_index=True):
+    """
+    Converts a sorted "HASH:COUNT" text dump into the binary format, written
+    next to the dump (or to `output_path`, which must end in .pwdb). Lines
+    must be in ascending hash order (as HIBP publishes them); the input is
+    streamed, so memory use doesn't grow with the dump. Returns the number
+    of records written.
+    """
+    output_path = output_path or os.path.splitext(text_path)[0] + DATABASE_SUFFIX
+    if not output_path.endswith(DATABASE_SUFFIX):
+        raise ValueError(
+            f"Breach database path must end in '{DATABASE_SUFFIX}'.")
+    flags = FLAG_PREFIX_INDEX if prefix_index else 0
+    bucket_starts = [None] * (_PREFIX_BUCKETS + 1)
+    count = 0
+    previous = b''
+
+    tmp_path = output_path + '.tmp'
+    with open(text_path, 'r', encoding='ascii') as src, open(tmp_path,
+                                                             'wb') as out:
+        # Header and index are rewritten once the record count is known
+        out.write(_HEADER.pack(MAGIC, VERSION, _HEADER.size, flags, 0))
+        if prefix_index:
+            out.write(bytes(_INDEX_SIZE))
+
+        for line_number, line in enumerate(src, 1):
+            line = line.strip()
+            if not line:
+                continue
+            hex_hash, _, occurrences = line.partition(':')
+            try:
+                digest = bytes.fromhex(hex_hash)
+                occurrences = int(occurrences or 1)
+            except ValueError:
+                raise ValueError(
+                    f"Line {line_number}: expected HASH:COUNT, got {line[:60]!r}")
+            if len(digest) != DIGEST_SIZE:
+                raise ValueError(
+                    f"Line {line_number}: not a SHA-1 hash: {hex_hash[:60]!r}")
+            if digest <= previous:
+                raise ValueError(
+                    f"Line {line_number}: hashes must be sorted in ascending order without duplicates."
+                )
+            previous = digest
+
+            bucket = int.from_bytes(digest[:2], 'big')
+            if bucket_starts[bucket] is None:
+                bucket_starts[bucket] = count
+            out.write(_RECORD.pack(digest, min(occurrences, 0xFFFFFFFF)))
+            count += 1
+
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, VERSION, _HEADER.size, flags, count))
+        if prefix_index:
+            # Empty buckets start where the next non-empty bucket starts
+            bucket_starts[_PREFIX_BUCKETS] = count
+            for bucket in range(_PREFIX_BUCKETS - 1, -1, -1):
+                if bucket_starts[bucket] is None:
+                    bucket_starts[bucket] = bucket_starts[bucket + 1]
+            out.write(
+                struct.pack(f'<{_PREFIX_BUCKETS + 1}Q', *bucket_starts))
+
+    os.replace(tmp_path, output_path)
+    return count
+
+
+class BreachDatabase:
+    """Read-only, memory-mapped view of a converted breach dump."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"'{path}' is not a breach database.")
+        magic, version, header_size, flags, self.record_count = (
+            _HEADER.unpack_from(self._mm, 0))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a breach database.")
+
+        self._has_index = bool(flags & FLAG_PREFIX_INDEX)
+        self._index_start = header_size
+        self._records_start = header_size + (_INDEX_SIZE
+                                             if self._has_index else 0)
+        expected = self._records_start + self.record_count * _RECORD.size
+        if len(self._mm) < expected:
+            raise ValueError(f"Breach database '{path}' is truncated.")
+
+    def __len__(self):
+        return self.record_count
+
+    def _bucket(self, digest):
+        if not self._has_index:
+            return 0, self.record_count
+        position = self._index_start + _INDEX_ENTRY.size * int.from_bytes(
+            digest[:2], 'big')
+        return struct.unpack_from('<QQ', self._mm, position)
+
+    def lookup_digest(self, digest):
+        """Returns the breach count for a raw SHA-1 digest (0 if absent)."""
+        mm = self._mm
+        base = self._records_start
+        lo, hi = self._bucket(digest)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = base + mid * _RECORD.size
+            candidate = mm[offset:offset + DIGEST_SIZE]
+            if candidate < digest:
+                lo = mid + 1
+            elif candidate > digest:
+                hi = mid
+            else:
+                return _RECORD.unpack_from(mm, offset)[1]
+        return 0
+
+    def count(self, password):
+        """How many times `password` appears in the breach dump (0 if never)."""
+        return self.lookup_digest(
+            hashlib.sha1(password.encode('utf-8')).digest())
+
+    def __contains__(self, password):
+        return self.count(password) > 0
+
+    def close(self):
+        self._mm.close()
+
+
+_DATABASE = None
+_DATABASE_LOADED = False
+_DATABASE_LOCK = threading.Lock()
+
+
+def get_breach_database():
+    """
+    Returns the BreachDatabase configured through BREACHED_PASSWORDS_PATH,
+    opened once per process, or None when no database is configured.
+    """
+    global _DATABASE, _DATABASE_LOADED
+    if not _DATABASE_LOADED:
+        with _DATABASE_LOCK:
+            if not _DATABASE_LOADED:
+                path = os.environ.get(BREACH_DB_ENV)
+                _DATABASE = BreachDatabase(path) if path else None
+                _DATABASE_LOADED = True
+    return _DATABASE
+
+
+def breach_count(password):
+    """Breach count for `password`, or None when breach checks are disabled."""
+    database = get_breach_database()
+    return None if database is None else database.count(password)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) in (3, 4) and sys.argv[1] == 'convert':
+        output_path = sys.argv[3] if len(sys.argv) == 4 else (
+            os.path.splitext(sys.argv[2])[0] + DATABASE_SUFFIX)
+        written = convert_dump(sys.argv[2], output_path)
+        print(f"Wrote {written:,} hashes to {output_path}")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'check':
+        print(BreachDatabase(sys.argv[2]).count(sys.argv[3]))
+    else:
+        print("Usage: python breach_lookup.py convert DUMP.txt [OUTPUT.pwdb]\n"
+              "       python breach_lookup.py check DATABASE.pwdb PASSWORD")
+        sys.exit(2)
@@ -0,0 +1,173 @@
+# dictionary_index.py
+from wordlist_registry import get_wordlist
+
+# Shortest word worth reporting; shorter ones match almost any random string
+DEFAULT_MIN_WORD_LENGTH = 3
+
+# Case and leetspeak folding applied to both the words and the searched text.
+# Every mapping is one character to one character, so match positions in the
+# folded text are positions in the original. 'l' folds together with 'i'
+# because '1', '!' and '|' stand in for either.
+_LEET_SUBSTITUTIONS = {
+    'a': '4@',
+    'b': '8',
+    'c': '(',
+    'e': '3',
+    'g': '69',
+    'i': '1!|l',
+    'o': '0',
+    's': '$5',
+    't': '7+',
+    'z': '2'
+}
+_FOLD_TABLE = {ord(c): ord(c.lower()) for c in map(chr, range(65, 91))}
+for _letter, _stand_ins in _LEET_SUBSTITUTIONS.items():
+    for _char in _stand_ins + _letter.upper():
+        _FOLD_TABLE[ord(_char)] = ord(_letter)
+_FOLD_TABLE[ord('L')] = ord('i')
+
+# Transitions live in one dict keyed by (state << _STATE_SHIFT) | code point,
+# which is far more compact than a dict per trie node.
+_STATE_SHIFT = 21
+
+
+def fold(text):
+    return text.translate(_FOLD_TABLE)
+
+
+class DictionaryIndex:
+    """
+    Aho-Corasick automaton over a wordlist. Finds every embedded word,
+    including case-folded and leetspeak variants, in a single linear pass
+    over the text.
+    """
+
+    def __init__(self, words, min_word_length=DEFAULT_MIN_WORD_LENGTH):
+        self.words = []
+        self.min_word_length = min_word_length
+        goto = {}
+        outputs = [None]  # Word ids ending at each state
+        state_count = 1
+
+        # Build the trie over the folded words
+        for word in words:
+            if len(word) < min_word_length:
+                continue
+            word_id = len(self.words)
+            self.words.append(word)
+            state = 0
+            for char in fold(word):
+                key = (state << _STATE_SHIFT) | ord(char)
+                next_state = goto.get(key)
+                if next_state is None:
+                    next_state = state_count
+                    state_count += 1
+                    goto[key] = next_state
+                    outputs.append(None)
+                state = next_state
+            if outputs[state] is None:
+                outputs[state] = []
+            outputs[state].append(word_id)
+
+        # Breadth-first pass for failure links, plus "dictionary suffix"
+        # links that jump straight to the next state with an output.
+        children = [[] for _ in range(state_count)]
+        for key, child in goto.items():
+            children[key >> _STATE_SHIFT].append(
+                (key & ((1 << _STATE_SHIFT) - 1), child))
+        fail = [0] * state_count
+        output_link = [0] * state_count
+        queue = [child for _, child in children[0]]
+        for state in queue:
+            for code, child in children[state]:
+                target = fail[state]
+                while True:
+                    nxt = goto.get((target << _STATE_SHIFT) | code)
+                    if nxt is not None:
+                        fail[child] = nxt
+                        break
+                    if target == 0:
+                        break
+                    target = fail[target]
+                link = fail[child]
+                output_link[child] = link if outputs[link] else output_link[
+                    link]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self._output_link = output_link
+
+    def __len__(self):
+        return len(self.words)
+
+    def _scan(self, text):
+        # Yields (end position, state) for every state that has outputs
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        output_link = self._output_link
+        state = 0
+        for pos, char in enumerate(fold(text)):
+            code = ord(char)
+            while True:
+                nxt = goto.get((state << _STATE_SHIFT) | code)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            hit = state if outputs[state] else output_link[state]
+            while hit:
+                yield pos, hit
+                hit = output_link[hit]
+
+    def find_all(self, text, min_word_length=None):
+        """
+        Returns every dictionary match in `text` as a list of dicts with
+        the start index `i`, end index `j` (inclusive), the matched `token`,
+        the dictionary `word` and whether the token is a leetspeak variant.
+        """
+        min_word_length = min_word_length or self.min_word_length
+        matches = []
+        for end, state in self._scan(text):
+            for word_id in self._outputs[state]:
+                word = self.words[word_id]
+                if len(word) < min_word_length:
+                    continue
+                start = end - len(word) + 1
+                token = text[start:end + 1]
+                matches.append({
+                    'i': start,
+                    'j': end,
+                    'token': token,
+                    'word': word,
+                    'l33t': token.lower() != word.lower()
+                })
+        return matches
+
+    def contains_word(self, text, min_word_length=None):
+        """True if any dictionary word of at least `min_word_length` occurs."""
+        min_word_length = min_word_length or self.min_word_length
+        for _, state in self._scan(text):
+            for word_id in self._outputs[state]:
+                if len(self.words[word_id]) >= min_word_length:
+                    return True
+        return False
+
+
+def get_dictionary_index(wordlist_name="eff_long_wordlist.txt"):
+    """Returns the automaton for a registered wordlist, built once and cached
+    on its registry entry."""
+    entry = get_wordlist(wordlist_name)
+    return entry.get_derived('dictionary_index',
+                             lambda: DictionaryIndex(entry.words))
+
+
+if __name__ == "__main__":
+    index = get_dictionary_index()
+    for sample in ("xxTiGeRxx", "0c34n-l3m0n", "h7#Kp2!vQz@9"):
+        print(sample, [(m['token'], m['word'], m['l33t'])
+                       for m in index.find_all(sample, 4)])
@@ -0,0 +1,143 @@
+# entropy_calculator.py
+import functools
+import math
+from itertools import combinations
+
+from bounded_cache import BoundedLRUCache, MISSING
+from password_generator import PASSPHRASE_SYMBOLS
+
+# Per-policy entropy results, keyed like the policy cache
+_PASSWORD_ENTROPY = BoundedLRUCache(maxsize=512)
+
+
+def _sequence_count(alphabet_size, length, no_repeating_chars):
+    # Number of length-`length` strings over an alphabet of the given size,
+    # optionally with no character immediately repeated.
+    if alphabet_size <= 0 or length <= 0:
+        return 0
+    if no_repeating_chars:
+        return alphabet_size * (alphabet_size - 1)**(length - 1)
+    return alphabet_size**length
+
+
+def count_valid_passwords(alphabet_size, length, required_sizes=(),
+                          no_repeating_chars=False):
+    """
+    Exact number of distinct passwords a policy can produce.
+
+    `required_sizes` are the sizes of the disjoint character types that must
+    each appear at least once. Counted by inclusion-exclusion over the
+    subsets of types that are missing; restricting to a smaller alphabet
+    keeps the no-repeat structure, so the same sum covers both constraints.
+    """
+    if no_repeating_chars and alphabet_size < 2:
+        no_repeating_chars = False  # Can't be enforced with one character
+
+    total = 0
+    for k in range(len(required_sizes) + 1):
+        for missing in combinations(required_sizes, k):
+            total += (-1)**k * _sequence_count(alphabet_size - sum(missing),
+                                               length, no_repeating_chars)
+    return total
+
+
+def password_entropy_bits(policy):
+    """
+    Entropy in bits of a compiled GenerationPolicy, assuming passwords are
+    drawn uniformly from every password that satisfies it (as the generators
+    do). Memoized per policy.
+    """
+    bits = _PASSWORD_ENTROPY.get(policy.key)
+    if bits is MISSING:
+        required_sizes = ()
+        if policy.require_min_char_types:
+            required_sizes = tuple(map(len, policy.required_alphabets))
+        count = count_valid_passwords(len(policy.alphabet), policy.length,
+                                      required_sizes,
+                                      policy.no_repeating_chars)
+        bits = math.log2(count) if count > 0 else 0.0
+        _PASSWORD_ENTROPY.put(policy.key, bits)
+    return bits
+
+
+@functools.lru_cache(maxsize=512)
+def passphrase_entropy_bits(num_words, wordlist_size, include_digit=True,
+                            include_symbol=True, capitalization="none",
+                            placement="random"):
+    """
+    Entropy in bits of a passphrase: the words themselves, a coin flip per
+    word for random capitalization, the inserted digit and symbol, and, with
+    random placement, which slots they land in.
+    """
+    if num_words <= 0 or wordlist_size <= 0:
+        return 0.0
+
+    bits = num_words * math.log2(wordlist_size)
+    if capitalization == "random":
+        bits += num_words  # Each word is capitalized or not, 50/50
+
+    extras = int(bool(include_digit)) + int(bool(include_symbol))
+    if include_digit:
+        bits += math.log2(10)
+    if include_symbol:
+        bits += math.log2(len(PASSPHRASE_SYMBOLS))
+
+    if placement not in ("start", "end") and extras:
+        # Distinct ordered slots for the extras among the final elements
+        slots = 1
+        for i in range(extras):
+            slots *= num_words + extras - i
+        bits += math.log2(slots)
+    return bits
+
+
+def batch_password_entropy_bits(policies):
+    """
+    Entropy in bits for many compiled policies at once. With numpy the
+    inclusion-exclusion sums for all policies are evaluated together, in
+    ratio form so large alphabets and lengths stay within float range.
+    Returns a list of floats in the same order as `policies`.
+    """
+    try:
+        import numpy as np  # Deferred: only the batch API needs it
+    except ImportError:  # numpy is optional; fall back to a loop
+        np = None
+    policies = list(policies)
+    if np is None or not policies:
+        return [password_entropy_bits(policy) for policy in policies]
+
+    max_types = max(len(policy.required_alphabets) for policy in policies)
+    count = len(policies)
+    n = np.array([len(policy.alphabet) for policy in policies], dtype=float)
+    length = np.array([policy.length for policy in policies], dtype=float)
+    no_repeat = np.array([policy.no_repeating_chars for policy in policies])
+    no_repeat &= n >= 2
+    type_sizes = np.zeros((count, max_types))
+    type_counts = np.zeros(count, dtype=int)
+    for i, policy in enumerate(policies):
+        if policy.require_min_char_types:
+            sizes = list(map(len, policy.required_alphabets))
+            type_sizes[i, :len(sizes)] = sizes
+            type_counts[i] = len(sizes)
+
+    # log2 of the unconstrained count for each policy
+    base_bits = np.where(
+        no_repeat,
+        np.log2(n) + (length - 1) * np.log2(np.maximum(n - 1, 1)),
+        length * np.log2(n))
+
+    # Sum over subsets of missing types of sign * count(subset) / count(all)
+    ratio = np.zeros(count)
+    for subset in range(1 << max_types):
+        members = [t for t in range(max_types) if subset >> t & 1]
+        applies = type_counts >= (members[-1] + 1 if members else 0)
+        m = n - type_sizes[:, members].sum(axis=1)
+        plain = np.clip(m / n, 0, None)**length
+        spread = np.clip(m / n, 0, None) * np.clip(
+            (m - 1) / np.maximum(n - 1, 1), 0, None)**(length - 1)
+        term = np.where(no_repeat, spread, plain)
+        ratio += np.where(applies, (-1)**len(members) * term, 0.0)
+
+    with np.errstate(divide='ignore'):
+        bits = base_bits + np.log2(np.clip(ratio, 0, None))
+    return np.where(np.isfinite(bits), bits, 0.0).tolist()
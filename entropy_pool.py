@@ -0,0 +1,208 @@
+# entropy_pool.py
+import itertools
+import os
+import random
+import threading
+
+# Bytes fetched from the OS per refill; one syscall serves thousands of draws
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class EntropyPool:
+    """
+    Thread-safe source of cryptographically secure random numbers.
+    Pulls a large block from os.urandom at a time and hands out unbiased
+    bounded integers from it (rejection sampling, never a plain modulo).
+    Offers the subset of the `random` module API used by the generators.
+
+    Passing `seed` makes the pool deterministic (bytes come from a seeded
+    Mersenne Twister instead of the OS). Only use that for load tests and
+    reproducible benchmarks, never for real credentials.
+    """
+
+    def __init__(self,
+                 buffer_size=DEFAULT_BUFFER_SIZE,
+                 source=os.urandom,
+                 seed=None):
+        if seed is not None:
+            source = random.Random(seed).randbytes
+        self._buffer_size = buffer_size
+        self._source = source
+        self._buffer = b''
+        self._pos = 0
+        self._lock = threading.Lock()
+
+    def _discard(self):
+        # Forget buffered bytes so a forked child can't replay its parent's
+        with self._lock:
+            self._buffer = b''
+            self._pos = 0
+
+    def _take(self, size):
+        # Caller must hold the lock. Returns the offset of `size` fresh bytes.
+        if self._pos + size > len(self._buffer):
+            self._buffer = self._source(self._buffer_size)
+            self._pos = 0
+        start = self._pos
+        self._pos += size
+        return start
+
+    def random_bytes(self, size):
+        if size > self._buffer_size // 4:
+            return self._source(size)  # Large requests bypass the pool
+        with self._lock:
+            start = self._take(size)
+            return self._buffer[start:start + size]
+
+    def randbelow(self, n):
+        """Returns a uniform random integer in [0, n)."""
+        if n <= 0:
+            raise ValueError("Upper bound must be positive.")
+        nbytes = ((n - 1).bit_length() + 7) // 8 or 1
+        span = 1 << (8 * nbytes)
+        limit = span - span % n  # Values >= limit would bias the result
+
+        with self._lock:
+            if nbytes == 1:
+                while True:
+                    start = self._take(1)
+                    value = self._buffer[start]
+                    if value < limit:
+                        return value % n
+            while True:
+                start = self._take(nbytes)
+                value = int.from_bytes(self._buffer[start:start + nbytes],
+                                       'little')
+                if value < limit:
+                    return value % n
+
+    def randint(self, a, b):
+        """Returns a uniform random integer in [a, b], like random.randint."""
+        return a + self.randbelow(b - a + 1)
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence.")
+        return seq[self.randbelow(len(seq))]
+
+    def shuffle(self, x):
+        # Fisher-Yates, in place
+        for i in range(len(x) - 1, 0, -1):
+            j = self.randbelow(i + 1)
+            x[i], x[j] = x[j], x[i]
+
+    def sample(self, population, k):
+        items = list(population)
+        if not 0 <= k <= len(items):
+            raise ValueError("Sample larger than population.")
+        # Partial Fisher-Yates: only the first k positions are needed
+        for i in range(k):
+            j = i + self.randbelow(len(items) - i)
+            items[i], items[j] = items[j], items[i]
+        return items[:k]
+
+
+# Process-wide pool shared by every thread (serializes on its lock)
+_DEFAULT_POOL = EntropyPool()
+
+# Per-thread pools, so threaded workers never contend on one lock
+_THREAD_LOCAL = threading.local()
+# Bumped after fork so children rebuild their pools instead of replaying
+_FORK_GENERATION = 0
+
+# Deterministic mode, switched on only by an explicit set_seed() call: per-
+# thread pools are then seeded from this value and the order in which
+# threads first ask for a pool. Forked children also mix in their pid, so
+# worker processes don't replay each other's streams.
+_SEED = None
+_SEED_PID = None
+_THREAD_COUNTER = itertools.count()
+
+
+def _after_fork_in_child():
+    global _FORK_GENERATION
+    _FORK_GENERATION += 1
+    _DEFAULT_POOL._discard()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def get_default_pool():
+    return _DEFAULT_POOL
+
+
+def get_thread_rng():
+    """Returns the calling thread's own EntropyPool, creating it on first use."""
+    state = _THREAD_LOCAL.__dict__
+    pool = state.get('pool')
+    if pool is None or state['generation'] != _FORK_GENERATION:
+        if _SEED is None:
+            pool = EntropyPool()
+        elif os.getpid() == _SEED_PID:
+            pool = EntropyPool(seed=f"{_SEED}:{next(_THREAD_COUNTER)}")
+        else:
+            pool = EntropyPool(
+                seed=f"{_SEED}:{os.getpid()}:{next(_THREAD_COUNTER)}")
+        state['pool'] = pool
+        state['generation'] = _FORK_GENERATION
+    return pool
+
+
+def set_seed(seed):
+    """
+    Switches the per-thread pools to deterministic mode (or back to the OS
+    CSPRNG with None). Pools are rebuilt lazily on each thread's next draw.
+    For benchmarks and load tests only: every password generated afterwards
+    is predictable.
+    """
+    global _SEED, _SEED_PID, _THREAD_COUNTER, _FORK_GENERATION
+    _SEED = None if seed is None else str(seed)
+    _SEED_PID = os.getpid()
+    _THREAD_COUNTER = itertools.count()
+    _FORK_GENERATION += 1  # Invalidates every thread's current pool
+
+
+if __name__ == "__main__":
+    import secrets
+    import time
+
+    draws = 1_000_000
+    alphabet = ''.join(chr(c) for c in range(33, 127))
+    pool = EntropyPool()
+
+    def bench(label, fn):
+        started = time.perf_counter()
+        for _ in range(draws):
+            fn(alphabet)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<28} {draws / elapsed:>14,.0f} draws/s")
+
+    print(f"--- {draws:,} choices from a {len(alphabet)}-character alphabet ---")
+    bench("random.choice (not CSPRNG)", random.choice)
+    bench("secrets.choice", secrets.choice)
+    bench("EntropyPool.choice", pool.choice)
+
+    from password_generator import generate_password
+
+    def threaded(label, rng_for_thread, threads, per_thread=20000):
+        def work():
+            rng = rng_for_thread()
+            for _ in range(per_thread):
+                generate_password(length=16, rng=rng)
+
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        print(f"{label:<28} {threads:>2} threads "
+              f"{threads * per_thread / elapsed:>12,.0f} passwords/s")
+
+    print("\n--- generate_password(length=16) from concurrent threads ---")
+    for threads in (1, 2, 4, 8):
+        threaded("shared locked pool", get_default_pool, threads)
+        threaded("per-thread pools", get_thread_rng, threads)
@@ -0,0 +1,207 @@
+# generator_cli.py
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from password_generator import (compile_policy, generate_passphrase,
+                                generate_passphrase_batch)
+
+# Items generated per unit of work handed to a worker process
+DEFAULT_CHUNK_SIZE = 100000
+# Output buffer size; results are written in large blocks
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m password_generator',
+        description='Generate random passwords or passphrases in bulk.')
+    parser.add_argument('--type',
+                        choices=['password', 'passphrase'],
+                        default='password',
+                        help='What to generate (default: password).')
+    parser.add_argument('-n',
+                        '--count',
+                        type=int,
+                        default=1,
+                        help='Number of items to generate (default: 1).')
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes to split the work across (default: 1).')
+    parser.add_argument('-o',
+                        '--output',
+                        help='Write results to this file instead of stdout.')
+    parser.add_argument('--chunk-size',
+                        type=int,
+                        default=DEFAULT_CHUNK_SIZE,
+                        help='Items generated per unit of work.')
+
+    password = parser.add_argument_group('password options')
+    password.add_argument('--length', type=int, default=12)
+    password.add_argument('--no-uppercase',
+                          dest='include_uppercase',
+                          action='store_false')
+    password.add_argument('--no-lowercase',
+                          dest='include_lowercase',
+                          action='store_false')
+    password.add_argument('--no-digits',
+                          dest='include_digits',
+                          action='store_false')
+    password.add_argument('--no-symbols',
+                          dest='include_symbols',
+                          action='store_false')
+    password.add_argument('--exclude-ambiguous', action='store_true')
+    password.add_argument('--exclude-chars',
+                          dest='exclude_custom_chars',
+                          default='',
+                          help='Characters to leave out.')
+    password.add_argument('--charset',
+                          dest='custom_character_set',
+                          default='',
+                          help='Use ONLY these characters.')
+    password.add_argument(
+        '--require-all-types',
+        dest='require_min_char_types',
+        action='store_true',
+        help='Include at least one character of each selected type.')
+    password.add_argument('--no-repeat',
+                          dest='no_repeating_chars',
+                          action='store_true',
+                          help='No immediately repeating characters.')
+    password.add_argument(
+        '--reject-dictionary-words',
+        action='store_true',
+        help='Regenerate passwords that contain a dictionary word.')
+    password.add_argument(
+        '--reject-breached',
+        action='store_true',
+        help='Regenerate passwords found in the breached-password database '
+        '(BREACHED_PASSWORDS_PATH).')
+
+    passphrase = parser.add_argument_group('passphrase options')
+    passphrase.add_argument('--words', dest='num_words', type=int, default=4)
+    passphrase.add_argument('--separator', default='-')
+    passphrase.add_argument('--no-digit',
+                            dest='include_digit',
+                            action='store_false')
+    passphrase.add_argument('--no-symbol',
+                            dest='include_symbol',
+                            action='store_false')
+    passphrase.add_argument('--wordlist',
+                            dest='wordlist_name',
+                            default='eff_long_wordlist.txt')
+    passphrase.add_argument('--capitalization',
+                            choices=['none', 'first', 'all', 'random'],
+                            default='none')
+    passphrase.add_argument('--placement',
+                            choices=['random', 'start', 'end'],
+                            default='random')
+    return parser
+
+
+def _generator_options(args):
+    if args.type == 'password':
+        return {
+            'length': args.length,
+            'include_uppercase': args.include_uppercase,
+            'include_lowercase': args.include_lowercase,
+            'include_digits': args.include_digits,
+            'include_symbols': args.include_symbols,
+            'exclude_ambiguous': args.exclude_ambiguous,
+            'exclude_custom_chars': args.exclude_custom_chars,
+            'custom_character_set': args.custom_character_set,
+            'require_min_char_types': args.require_min_char_types,
+            'no_repeating_chars': args.no_repeating_chars,
+            'reject_dictionary_words': args.reject_dictionary_words,
+            'reject_breached': args.reject_breached
+        }
+    return {
+        'num_words': args.num_words,
+        'separator': args.separator,
+        'include_digit': args.include_digit,
+        'include_symbol': args.include_symbol,
+        'wordlist_name': args.wordlist_name,
+        'capitalization': args.capitalization,
+        'placement': args.placement
+    }
+
+
+def generate_chunk(generation_type, options, count):
+    """
+    Generates `count` items and returns them as one newline-terminated,
+    UTF-8 encoded block. Runs in worker processes, so it only takes picklable
+    arguments and compiles the policy on the worker side.
+    """
+    if generation_type == 'password':
+        items = compile_policy(**options).generate_batch(count)
+    else:
+        items = generate_passphrase_batch(count, **options)
+    return ('\n'.join(items) + '\n').encode('utf-8')
+
+
+def _chunk_sizes(count, chunk_size):
+    for start in range(0, count, chunk_size):
+        yield min(chunk_size, count - start)
+
+
+def _open_output(path):
+    if not path:
+        return open(sys.stdout.fileno(),
+                    'wb',
+                    buffering=WRITE_BUFFER_SIZE,
+                    closefd=False)
+    # Generated credentials are secrets: create the file owner-readable only
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    return open(fd, 'wb', buffering=WRITE_BUFFER_SIZE)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.count < 1:
+        parser.error('--count must be at least 1.')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1.')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1.')
+
+    options = _generator_options(args)
+    try:
+        # Surface option errors before any worker starts or output is opened
+        if args.type == 'password':
+            compile_policy(**options)
+        else:
+            generate_passphrase(**options)
+    except (ValueError, IOError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    sizes = _chunk_sizes(args.count, args.chunk_size)
+    with _open_output(args.output) as out:
+        if args.workers == 1:
+            for size in sizes:
+                out.write(generate_chunk(args.type, options, size))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                # Keep a couple of chunks in flight per worker; results are
+                # written in submission order as soon as they are ready.
+                pending = deque()
+                for size in sizes:
+                    pending.append(
+                        executor.submit(generate_chunk, args.type, options,
+                                        size))
+                    if len(pending) >= 2 * args.workers:
+                        out.write(pending.popleft().result())
+                while pending:
+                    out.write(pending.popleft().result())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
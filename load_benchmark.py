@@ -0,0 +1,161 @@
+# load_benchmark.py
+#
+# Closed-loop HTTP load generator for comparing deployments of the API, e.g.
+#
+#   gunicorn -w 4 -b 127.0.0.1:8080 app:app
+#   uvicorn --workers 4 --port 8081 asgi_app:app
+#
+#   python load_benchmark.py http://127.0.0.1:8080 http://127.0.0.1:8081
+#
+# Each target gets `--connections` keep-alive connections that send
+# /generate requests back to back for `--duration` seconds; requests/sec and
+# latency percentiles are reported per target. With `--background-batches N`
+# N connections keep streaming large /generate/batch requests at the same
+# time, which shows how single requests fare next to bulk work.
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_BODY = {'type': 'password', 'length': 16}
+BATCH_BODY = {'type': 'password', 'length': 16, 'count': 50000}
+
+
+class _Connection:
+    """Minimal HTTP/1.1 keep-alive client, enough for JSON and NDJSON."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, path, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port)
+        payload = json.dumps(body).encode('utf-8')
+        self.writer.write(
+            (f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+             f"Content-Type: application/json\r\n"
+             f"Content-Length: {len(payload)}\r\n\r\n").encode('ascii') +
+            payload)
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Server closed the connection.')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self.reader.read()  # Body ends when the server closes
+            self.close()
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _worker(host, port, path, body, deadline, latencies, counters):
+    connection = _Connection(host, port)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status = await connection.request(path, body)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            counters['errors'] += 1
+            connection.close()
+            await asyncio.sleep(0.01)
+            continue
+        if latencies is not None:
+            latencies.append(time.perf_counter() - started)
+        counters['ok' if status == 200 else 'errors'] += 1
+    connection.close()
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_target(url, connections, duration, background_batches):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    deadline = time.perf_counter() + duration
+    latencies = []
+    counters = {'ok': 0, 'errors': 0}
+    batch_counters = {'ok': 0, 'errors': 0}
+
+    tasks = [
+        _worker(host, port, '/generate', DEFAULT_BODY, deadline, latencies,
+                counters) for _ in range(connections)
+    ]
+    tasks += [
+        _worker(host, port, '/generate/batch', BATCH_BODY, deadline, None,
+                batch_counters) for _ in range(background_batches)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'url': url,
+        'requests': counters['ok'],
+        'errors': counters['errors'],
+        'batches': batch_counters['ok'],
+        'requests_per_sec': counters['ok'] / elapsed,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare requests/sec and latency of API deployments.')
+    parser.add_argument('urls', nargs='+', help='Base URL of each deployment.')
+    parser.add_argument('-c', '--connections', type=int, default=32)
+    parser.add_argument('-d', '--duration', type=float, default=10.0)
+    parser.add_argument('--background-batches', type=int, default=0)
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON.')
+    args = parser.parse_args(argv)
+
+    results = [
+        asyncio.run(
+            run_target(url, args.connections, args.duration,
+                       args.background_batches)) for url in args.urls
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'target':<28} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7} {'batches':>8}")
+    for r in results:
+        print(f"{r['url']:<28} {r['requests_per_sec']:>9.0f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7} "
+              f"{r['batches']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+# metrics.py
+#
+# Request metrics in the Prometheus text exposition format.
+#
+# Hot-path updates never take a lock: every thread writes to its own shard
+# (plain dicts only that thread mutates), and a scrape sums the shards.
+# Shards of finished threads are folded into one retired shard whenever a
+# new thread registers its shard and at scrape time, so thread-per-request
+# servers don't grow the shard list between scrapes.
+# Metrics are per process: a forked worker starts from zero.
+import os
+import threading
+import time
+from bisect import bisect_left
+
+NAMESPACE = 'password_generator'
+
+# Upper bounds (seconds) of the latency histogram buckets, plus +Inf
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5)
+
+_COUNTER_HELP = {
+    'requests_total': 'Requests handled, by route and generation type.',
+    'errors_total': 'Requests that failed, by route and error class.',
+    'items_generated_total': 'Passwords and passphrases generated, by type.',
+    'rejected_total': 'Requests turned away with 429, by route and limit.',
+}
+_STAGE_HELP = 'Time spent in each stage of request handling.'
+
+
+class _Shard:
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # stage -> [bucket counts..., sum]
+
+
+_LOCAL = threading.local()
+_SHARDS = []
+_SHARDS_LOCK = threading.Lock()  # Only taken when shards come and go
+_RETIRED = _Shard(None)
+
+
+def _shard():
+    shard = getattr(_LOCAL, 'shard', None)
+    if shard is None:
+        shard = _LOCAL.shard = _Shard(threading.current_thread())
+        with _SHARDS_LOCK:
+            _retire_finished()
+            _SHARDS.append(shard)
+    return shard
+
+
+def reset():
+    """Drops every recorded counter and latency sample."""
+    global _LOCAL, _RETIRED
+    with _SHARDS_LOCK:
+        _LOCAL = threading.local()
+        _SHARDS.clear()
+        _RETIRED = _Shard(None)
+
+
+def _after_fork_in_child():
+    global _SHARDS_LOCK
+    _SHARDS_LOCK = threading.Lock()
+    reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def inc(name, labels=(), value=1):
+    """Adds `value` to counter `name`; labels are (name, value) pairs."""
+    counters = _shard().counters
+    key = (name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+
+def observe(stage, seconds):
+    """Records one latency sample for `stage`."""
+    histograms = _shard().histograms
+    buckets = histograms.get(stage)
+    if buckets is None:
+        buckets = histograms[stage] = [0] * (len(LATENCY_BUCKETS) + 2)
+    buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    buckets[-1] += seconds
+
+
+class stage:
+    """Context manager timing a block as one sample of `name`."""
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def _merge(target, shard):
+    for key, value in list(shard.counters.items()):
+        target.counters[key] = target.counters.get(key, 0) + value
+    for name, buckets in list(shard.histograms.items()):
+        merged = target.histograms.get(name)
+        if merged is None:
+            merged = target.histograms[name] = [0] * len(buckets)
+        for i, value in enumerate(buckets):
+            merged[i] += value
+
+
+def _retire_finished():
+    # Caller holds _SHARDS_LOCK. A finished thread can't write anymore, so
+    # its shard is final and can be folded into the retired one.
+    finished = [s for s in _SHARDS if not s.thread.is_alive()]
+    if finished:
+        for shard in finished:
+            _merge(_RETIRED, shard)
+        _SHARDS[:] = [s for s in _SHARDS if s not in finished]
+
+
+def snapshot():
+    """Returns a _Shard holding the totals across all threads."""
+    total = _Shard(None)
+    with _SHARDS_LOCK:
+        _retire_finished()
+        live = list(_SHARDS)
+        _merge(total, _RETIRED)
+    for shard in live:
+        _merge(total, shard)
+    return total
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (name + '="' + str(value).replace('\\', '\\\\').replace(
+        '"', '\\"').replace('\n', '\\n') + '"' for name, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(int(value))
+
+
+def _process_gauges():
+    # Cache and wordlist registry statistics, imported lazily so this module
+    # stays cheap to import
+    from ai_charset_analyzer import analyze_charset_definition
+    from ai_strength_model import predict_strength
+    from password_generator import get_policy_cache_stats
+    from password_prefetch import get_prefetcher
+    from wordlist_registry import BUNDLED_WORDLISTS, registry_stats
+
+    caches = {
+        'policy': get_policy_cache_stats(),
+        'strength': predict_strength.cache_stats(),
+        'charset': analyze_charset_definition.cache_stats(),
+    }
+    for field, kind, help_text in (
+        ('size', 'gauge', 'Entries currently cached.'),
+        ('hits', 'counter', 'Cache lookups that found an entry.'),
+        ('misses', 'counter', 'Cache lookups that found nothing.'),
+        ('evictions', 'counter', 'Entries dropped to stay within size.'),
+        ('expirations', 'counter', 'Entries dropped after their TTL.'),
+    ):
+        suffix = '_total' if kind == 'counter' else ''
+        yield (f'cache_{field}{suffix}', kind, help_text,
+               [((('cache', name),), stats[field])
+                for name, stats in caches.items()])
+
+    prefetcher = get_prefetcher()
+    if prefetcher is not None:
+        stats = prefetcher.stats()
+        yield ('prefetch_buffered', 'gauge', 'Passwords waiting in buffers.',
+               [((), stats['buffered'])])
+        yield ('prefetch_hits_total', 'counter',
+               'Requests served from a prefetch buffer.',
+               [((), stats['hits'])])
+        yield ('prefetch_misses_total', 'counter',
+               'Requests that found no buffered password.',
+               [((), stats['misses'])])
+
+    registry = registry_stats()
+    yield ('wordlists_loaded', 'gauge', 'Wordlists held by the registry.',
+           [((), registry['loaded'])])
+    yield ('wordlist_loads_total', 'counter', 'Wordlist files read.',
+           [((), registry['loads'])])
+    # Only the bundled wordlists get a label: other names come from clients
+    # and would give every request its own time series
+    yield ('wordlist_size', 'gauge', 'Words in each loaded bundled wordlist.',
+           [((('wordlist', name),), registry['wordlists'][name]['size'])
+            for name in BUNDLED_WORDLISTS if name in registry['wordlists']])
+
+
+def render():
+    """Returns every metric in the Prometheus text exposition format."""
+    totals = snapshot()
+    lines = []
+
+    counters = {}
+    for (name, labels), value in sorted(totals.counters.items()):
+        counters.setdefault(name, []).append((labels, value))
+    for name in sorted(set(_COUNTER_HELP) | set(counters)):
+        full = f'{NAMESPACE}_{name}'
+        lines.append(f'# HELP {full} {_COUNTER_HELP.get(name, name)}')
+        lines.append(f'# TYPE {full} counter')
+        for labels, value in counters.get(name, ()):
+            lines.append(f'{full}{_format_labels(labels)} {value}')
+
+    full = f'{NAMESPACE}_stage_seconds'
+    lines.append(f'# HELP {full} {_STAGE_HELP}')
+    lines.append(f'# TYPE {full} histogram')
+    for stage_name, buckets in sorted(totals.histograms.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'), ),
+                                buckets[:-1]):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{full}_bucket'
+                         f'{_format_labels((("stage", stage_name), ("le", le)))}'
+                         f' {cumulative}')
+        stage_labels = _format_labels((('stage', stage_name), ))
+        lines.append(f'{full}_sum{stage_labels} {buckets[-1]!r}')
+        lines.append(f'{full}_count{stage_labels} {cumulative}')
+
+    for name, kind, help_text, samples in _process_gauges():
+        full = f'{NAMESPACE}_{name}'
+        lines.append(f'# HELP {full} {help_text}')
+        lines.append(f'# TYPE {full} {kind}')
+        for labels, value in samples:
+            lines.append(
+                f'{full}{_format_labels(labels)} {_format_value(value)}')
+
+    return '\n'.join(lines) + '\n'
+
+
+# Content type Prometheus expects for the text format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
@@ -0,0 +1,294 @@
+# microbenchmarks.py
+#
+# Microbenchmarks for the generator, scorer and analyzer hot paths.
+#
+#   python microbenchmarks.py -o before.json          # run and save
+#   python microbenchmarks.py -o after.json --compare before.json
+#   python microbenchmarks.py --filter passphrase     # only matching cases
+#   python microbenchmarks.py --seed 1                # reproducible draws
+#
+# Each case is timed in several repeats of an automatically sized loop and
+# the median per-call time is reported, which is robust to the odd slow
+# repeat. Results are written as JSON together with the commit and platform
+# they were measured on; --compare prints the change per case and exits with
+# status 1 when any case got slower than the threshold.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+DEFAULT_REPEATS = 7
+# Each repeat runs its loop for at least this long (seconds)
+MIN_REPEAT_TIME = 0.1
+# --compare flags cases whose median got slower by more than this fraction
+DEFAULT_THRESHOLD = 0.10
+
+
+def _password_cases():
+    from password_generator import generate_password
+
+    variants = {
+        'default': {},
+        'exclude_ambiguous': {'exclude_ambiguous': True},
+        'exclude_custom': {'exclude_custom_chars': 'aeiou0123'},
+        'lower_digits': {'include_uppercase': False, 'include_symbols': False},
+        'require_types': {'require_min_char_types': True},
+        'no_repeat': {'no_repeating_chars': True},
+        'require_types_no_repeat': {
+            'require_min_char_types': True,
+            'no_repeating_chars': True
+        },
+    }
+    for length in (8, 16, 30):
+        for name, options in variants.items():
+            yield (f'generate_password/len{length}/{name}',
+                   lambda o=dict(options, length=length): generate_password(**o))
+
+
+def _passphrase_cases():
+    from password_generator import (generate_passphrase,
+                                    generate_passphrase_batch)
+
+    for wordlist in ('eff_long_wordlist.txt', 'eff_short_wordlist.txt'):
+        for capitalization in ('none', 'random'):
+            for placement in ('random', 'end'):
+                options = {
+                    'num_words': 5,
+                    'wordlist_name': wordlist,
+                    'capitalization': capitalization,
+                    'placement': placement
+                }
+                yield (f'generate_passphrase/{wordlist.split(".")[0]}/'
+                       f'{capitalization}/{placement}',
+                       lambda o=options: generate_passphrase(**o))
+    # Per-call time of 1000 passphrases, drawn in one vectorized step
+    for capitalization in ('none', 'random'):
+        yield (f'generate_passphrase_batch/1000/{capitalization}',
+               lambda c=capitalization: generate_passphrase_batch(
+                   1000, num_words=5, capitalization=c))
+
+
+def _scoring_cases():
+    from ai_charset_analyzer import analyze_charset_definition
+    from ai_strength_model import predict_strength
+    from password_analyzer import analyze_password
+
+    password_args = (16, True, True, True, True, False, '')
+    passphrase_kwargs = {
+        'length': 0,
+        'include_uppercase': False,
+        'include_lowercase': False,
+        'include_digits': True,
+        'include_symbols': True,
+        'exclude_ambiguous': False,
+        'exclude_custom_chars': '',
+        'is_passphrase': True,
+        'num_words': 5
+    }
+    charset_args = (True, True, True, True, True, 'abc01')
+
+    # Memoized entry points, plus the functions behind the caches
+    yield ('predict_strength/password',
+           lambda: predict_strength(*password_args))
+    yield ('predict_strength/password/uncached',
+           lambda: predict_strength.__wrapped__(*password_args))
+    yield ('predict_strength/passphrase',
+           lambda: predict_strength(**passphrase_kwargs))
+    yield ('predict_strength/passphrase/uncached',
+           lambda: predict_strength.__wrapped__(**passphrase_kwargs))
+    yield ('analyze_charset_definition',
+           lambda: analyze_charset_definition(*charset_args))
+    yield ('analyze_charset_definition/uncached',
+           lambda: analyze_charset_definition.__wrapped__(*charset_args))
+
+    for label, password in (('common', 'P@ssw0rd1'),
+                            ('random', 'h7#Kp2!vQz@9Lm4$'),
+                            ('passphrase', 'correct-horse-battery-staple-7')):
+        yield (f'analyze_password/{label}',
+               lambda p=password: analyze_password(p))
+
+
+def _handler_cases():
+    from app import app
+
+    client = app.test_client()
+    bodies = {
+        'password': {'type': 'password', 'length': 16},
+        'password_constrained': {
+            'type': 'password',
+            'length': 16,
+            'require_min_char_types': True,
+            'no_repeating_chars': True
+        },
+        'passphrase': {'type': 'passphrase', 'num_words': 5},
+    }
+
+    def post(body):
+        response = client.post('/generate', json=body)
+        if response.status_code != 200:
+            raise RuntimeError(f'/generate returned {response.status_code}')
+
+    for name, body in bodies.items():
+        yield f'flask_generate/{name}', lambda b=body: post(b)
+
+    def get(path, headers, status=200):
+        response = client.get(path, headers=headers)
+        if response.status_code != status:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+
+    etag = client.get('/script.js',
+                      headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    yield 'flask_static/script.js', lambda: get('/script.js', {})
+    yield 'flask_static/script.js/gzip', lambda: get(
+        '/script.js', {'Accept-Encoding': 'gzip'})
+    yield 'flask_static/script.js/not_modified', lambda: get(
+        '/script.js', {
+            'Accept-Encoding': 'gzip',
+            'If-None-Match': etag
+        }, 304)
+
+
+SUITES = (_password_cases, _passphrase_cases, _scoring_cases, _handler_cases)
+
+
+def time_case(func, repeats=DEFAULT_REPEATS, min_time=MIN_REPEAT_TIME):
+    """Returns timing stats for `func` (per call, in microseconds)."""
+    func()  # Warm caches and lazy imports outside the measurement
+
+    # Size the loop so a single repeat takes at least `min_time`
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(
+            2, min(10, int(min_time / elapsed) + 1))
+
+    samples = [elapsed / loops]
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - started) / loops)
+
+    median = statistics.median(samples)
+    return {
+        'median_us': median * 1e6,
+        'min_us': min(samples) * 1e6,
+        'ops_per_sec': 1 / median,
+        'loops': loops,
+        'repeats': repeats
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(name_filter=None, repeats=DEFAULT_REPEATS, min_time=MIN_REPEAT_TIME,
+        progress=None):
+    results = {}
+    for suite in SUITES:
+        for name, func in suite():
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = time_case(func, repeats, min_time)
+            if progress:
+                progress(name, results[name])
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns (rows, regressions) comparing median times of the cases both
+    runs share. Each row is (name, baseline us, current us, relative change).
+    """
+    rows = []
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        change = result['median_us'] / before['median_us'] - 1
+        rows.append((name, before['median_us'], result['median_us'], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark the generator, scorer and analyzer hot paths.')
+    parser.add_argument('-o', '--output', help='Write results to this JSON file.')
+    parser.add_argument('--compare',
+                        metavar='BASELINE',
+                        help='Compare against a previous results file.')
+    parser.add_argument('--threshold',
+                        type=float,
+                        default=DEFAULT_THRESHOLD,
+                        help='Slowdown (fraction) reported as a regression.')
+    parser.add_argument('--filter', help='Only run cases containing this text.')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--min-time',
+                        type=float,
+                        default=MIN_REPEAT_TIME,
+                        help='Minimum seconds per repeat.')
+    parser.add_argument('--seed',
+                        help='Seed the per-thread random pools, so every run '
+                        'draws the same passwords (benchmarks only).')
+    args = parser.parse_args(argv)
+    if args.seed is not None:
+        from entropy_pool import set_seed
+        set_seed(args.seed)
+
+    def progress(name, result):
+        print(f"{name:<58} {result['median_us']:>10.2f} us "
+              f"{result['ops_per_sec']:>12,.0f} ops/s", file=sys.stderr)
+
+    results = run(args.filter, args.repeats, args.min_time, progress)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows, regressions = compare(baseline, results, args.threshold)
+    print(f"\nBaseline {baseline['meta'].get('commit')} -> "
+          f"{results['meta'].get('commit')}")
+    print(f"{'case':<58} {'before us':>10} {'after us':>10} {'change':>8}")
+    for name, before, after, change in rows:
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f"{name:<58} {before:>10.2f} {after:>10.2f} "
+              f"{change:>+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,393 @@
+# password_analyzer.py
+import math
+import re
+import string
+from datetime import date
+
+from breach_lookup import breach_count
+from dictionary_index import DictionaryIndex, get_dictionary_index
+from wordlist_registry import get_wordlist
+
+# Longer input is scored on this prefix plus brute force for the rest, which
+# keeps per-call latency bounded no matter what gets pasted in.
+MAX_ANALYZED_LENGTH = 100
+
+# Wordlists whose words count as dictionary matches
+DICTIONARY_WORDLISTS = ("eff_long_wordlist.txt", )
+MIN_DICTIONARY_WORD_LENGTH = 3
+
+# A few passwords that top every leaked-password ranking, most common first
+COMMON_PASSWORDS = ("123456", "password", "123456789", "12345678", "12345",
+                    "qwerty", "1234567", "111111", "123123", "abc123",
+                    "password1", "1234", "iloveyou", "1q2w3e4r", "000000",
+                    "qwerty123", "zaq12wsx", "dragon", "sunshine", "princess",
+                    "letmein", "654321", "monkey", "football", "admin",
+                    "welcome", "login", "master", "passw0rd", "starwars")
+_COMMON_RANKS = {word: rank for rank, word in enumerate(COMMON_PASSWORDS, 1)}
+
+# Keyboard layouts for walk detection, unshifted and shifted rows
+_KEYBOARD_ROWS = ("`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./")
+_SHIFTED_ROWS = ("~!@#$%^&*()_+", "QWERTYUIOP{}|", 'ASDFGHJKL:"', "ZXCVBNM<>?")
+MIN_WALK_LENGTH = 3
+MIN_SEQUENCE_LENGTH = 3
+
+REFERENCE_YEAR = date.today().year
+MIN_YEAR_SPACE = 20
+
+_REPEAT_RE = re.compile(r'(.+?)\1+')
+_YEAR_RE = re.compile(r'(?<!\d)(19\d\d|20\d\d)(?!\d)')
+_DATE_RE = re.compile(r'(?<!\d)(\d{1,4})([-/._ ]?)(\d{1,2})\2(\d{1,4})(?!\d)')
+
+# Guess-count thresholds (log10) for scores 1..4, as used by zxcvbn
+_SCORE_THRESHOLDS = (3, 6, 8, 10)
+
+
+def _build_keyboard():
+    # Key positions on a staggered layout, plus for each key the set of
+    # keys physically next to it (shift-insensitive).
+    positions = {}
+    for rows in (_KEYBOARD_ROWS, _SHIFTED_ROWS):
+        for r, row in enumerate(rows):
+            for c, char in enumerate(row):
+                positions[char] = (r, c)
+    adjacency = {}
+    for char, (r, c) in positions.items():
+        neighbours = set()
+        for dr, dc in ((0, -1), (0, 1), (-1, 0), (-1, 1), (1, -1), (1, 0)):
+            rr, cc = r + dr, c + dc
+            for rows in (_KEYBOARD_ROWS, _SHIFTED_ROWS):
+                if 0 <= rr < len(rows) and 0 <= cc < len(rows[rr]):
+                    neighbours.add(rows[rr][cc])
+        adjacency[char] = neighbours
+    return positions, adjacency
+
+
+_KEY_POSITIONS, _ADJACENCY = _build_keyboard()
+_AVERAGE_DEGREE = sum(map(len, _ADJACENCY.values())) / len(_ADJACENCY)
+
+_COMMON_INDEX = None
+
+
+def _common_password_index():
+    global _COMMON_INDEX
+    if _COMMON_INDEX is None:
+        _COMMON_INDEX = DictionaryIndex(COMMON_PASSWORDS, min_word_length=4)
+    return _COMMON_INDEX
+
+
+def _cardinality(password):
+    # Brute-force alphabet size implied by the character types present
+    size = 0
+    if any(c in string.ascii_lowercase for c in password):
+        size += 26
+    if any(c in string.ascii_uppercase for c in password):
+        size += 26
+    if any(c in string.digits for c in password):
+        size += 10
+    if any(c in string.punctuation or c == ' ' for c in password):
+        size += 33
+    if any(ord(c) > 127 for c in password):
+        size += 100
+    return max(size, 10)
+
+
+def _case_variations_log10(token):
+    # Extra guesses an attacker spends on capitalization of a known word
+    if token.islower() or not any(c.isalpha() for c in token):
+        return 0.0
+    if token.isupper() or (token[0].isupper() and token[1:].islower()):
+        return math.log10(2)
+    upper = sum(1 for c in token if c.isupper())
+    lower = sum(1 for c in token if c.islower())
+    variations = sum(
+        math.comb(upper + lower, k) for k in range(1, min(upper, lower) + 1))
+    return math.log10(max(variations, 2))
+
+
+def _match(pattern, token, i, guesses_log10, **extra):
+    match = {
+        'pattern': pattern,
+        'token': token,
+        'i': i,
+        'j': i + len(token) - 1,
+        'guesses_log10': guesses_log10
+    }
+    match.update(extra)
+    return match
+
+
+def _l33t_variations_log10(token, word):
+    # One extra guess doubling per substituted character
+    substituted = sum(1 for t, w in zip(token.lower(), word.lower())
+                      if t != w)
+    return substituted * math.log10(2)
+
+
+def _dictionary_matches(password):
+    matches = []
+    sources = []
+    for name in DICTIONARY_WORDLISTS:
+        try:
+            sources.append((name, get_dictionary_index(name),
+                            math.log10(max(get_wordlist(name).size, 2))))
+        except (IOError, ValueError):
+            continue
+
+    for name, index, size_log10 in sources:
+        for found in index.find_all(password, MIN_DICTIONARY_WORD_LENGTH):
+            token = found['token']
+            guesses_log10 = size_log10 + _case_variations_log10(token)
+            if found['l33t']:
+                guesses_log10 += _l33t_variations_log10(token, found['word'])
+            matches.append(
+                _match('dictionary', token, found['i'], guesses_log10,
+                       wordlist=name, matched_word=found['word'],
+                       l33t=found['l33t']))
+
+    for found in _common_password_index().find_all(password):
+        token = found['token']
+        guesses_log10 = math.log10(
+            _COMMON_RANKS[found['word']]) + _case_variations_log10(token)
+        if found['l33t']:
+            guesses_log10 += _l33t_variations_log10(token, found['word'])
+        matches.append(
+            _match('dictionary', token, found['i'], guesses_log10,
+                   wordlist='common-passwords', matched_word=found['word'],
+                   l33t=found['l33t']))
+    return matches
+
+
+def _keyboard_walk_matches(password):
+    matches = []
+    n = len(password)
+    i = 0
+    while i < n - 1:
+        j = i
+        turns = 0
+        last_direction = None
+        while j + 1 < n and password[j + 1] in _ADJACENCY.get(
+                password[j], ()):
+            (r1, c1), (r2, c2) = (_KEY_POSITIONS[password[j]],
+                                  _KEY_POSITIONS[password[j + 1]])
+            direction = (r2 - r1, c2 - c1)
+            if direction != last_direction:
+                turns += 1
+                last_direction = direction
+            j += 1
+        length = j - i + 1
+        if length >= MIN_WALK_LENGTH:
+            # Starting key x walk length x a branch choice at every turn
+            guesses = len(_ADJACENCY) * length * _AVERAGE_DEGREE**turns
+            matches.append(
+                _match('keyboard_walk', password[i:j + 1], i,
+                       math.log10(guesses), turns=turns))
+            i = j
+        else:
+            i += 1
+    return matches
+
+
+def _repeat_matches(password):
+    matches = []
+    for m in _REPEAT_RE.finditer(password):
+        token, unit = m.group(0), m.group(1)
+        repeats = len(token) // len(unit)
+        if len(unit) == 1 and repeats < 3:
+            continue  # A single doubled character isn't worth a match
+        unit_log10 = len(unit) * math.log10(_cardinality(unit))
+        matches.append(
+            _match('repeat',
+                   token,
+                   m.start(),
+                   unit_log10 + math.log10(repeats),
+                   base_token=unit,
+                   repeat_count=repeats))
+    return matches
+
+
+def _sequence_matches(password):
+    matches = []
+    n = len(password)
+    i = 0
+    while i < n - 1:
+        delta = ord(password[i + 1]) - ord(password[i])
+        j = i + 1
+        if delta != 0 and abs(delta) <= 5:
+            while j + 1 < n and ord(password[j + 1]) - ord(
+                    password[j]) == delta:
+                j += 1
+        if j - i + 1 >= MIN_SEQUENCE_LENGTH and delta != 0 and abs(
+                delta) <= 5:
+            token = password[i:j + 1]
+            first = token[0]
+            if first in 'aAzZ019':
+                start_guesses = 4  # Obvious starting points
+            elif first.isdigit():
+                start_guesses = 10
+            else:
+                start_guesses = 26
+            guesses = start_guesses * len(token) * abs(delta) * (
+                2 if delta < 0 else 1)
+            matches.append(
+                _match('sequence', token, i, math.log10(guesses),
+                       ascending=delta > 0))
+            i = j + 1
+        else:
+            i += 1
+    return matches
+
+
+def _year_space(year):
+    return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+
+
+def _plausible_date(a, b, c):
+    # Try the usual day/month/year orderings; return the year if any fits
+    for day, month, year in ((a, b, c), (b, a, c), (b, c, a), (c, b, a)):
+        if year < 100:
+            year += 2000 if year <= REFERENCE_YEAR % 100 else 1900
+        if 1 <= day <= 31 and 1 <= month <= 12 and 1900 <= year <= 2099:
+            return year
+    return None
+
+
+def _date_matches(password):
+    matches = []
+    for m in _YEAR_RE.finditer(password):
+        matches.append(
+            _match('date', m.group(0), m.start(),
+                   math.log10(_year_space(int(m.group(0))))))
+
+    # Digit runs with or without separators, e.g. 1990-04-21 or 21041990
+    for start in range(len(password)):
+        m = _DATE_RE.match(password, start)
+        if m is None:
+            continue
+        a, separator, b, c = m.groups()
+        year = _plausible_date(int(a), int(b), int(c))
+        if year is None or len(m.group(0)) < 4:
+            continue
+        guesses = 365 * _year_space(year) * (4 if separator else 1)
+        matches.append(
+            _match('date',
+                   m.group(0),
+                   start,
+                   math.log10(guesses),
+                   separator=separator))
+    return matches
+
+
+def _minimum_guess_cover(password, matches):
+    # Dynamic programming over positions: the cheapest way (in log10
+    # guesses) to explain password[:k], either by a match ending at k - 1 or
+    # by brute-forcing one more character.
+    n = len(password)
+    char_log10 = math.log10(_cardinality(password))
+    ending_at = [[] for _ in range(n)]
+    for match in matches:
+        ending_at[match['j']].append(match)
+
+    best = [0.0] + [math.inf] * n
+    choice = [None] * (n + 1)
+    for k in range(1, n + 1):
+        best[k] = best[k - 1] + char_log10
+        choice[k] = None
+        for match in ending_at[k - 1]:
+            cost = best[match['i']] + match['guesses_log10']
+            if cost < best[k]:
+                best[k] = cost
+                choice[k] = match
+
+    # Walk back to recover the chosen matches (brute-force runs merged)
+    sequence = []
+    k = n
+    while k > 0:
+        match = choice[k]
+        if match is None:
+            start = k - 1
+            while start > 0 and choice[start] is None:
+                start -= 1
+            token = password[start:k]
+            sequence.append(
+                _match('bruteforce', token, start, len(token) * char_log10))
+            k = start
+        else:
+            sequence.append(match)
+            k = match['i']
+    sequence.reverse()
+    return best[n], sequence
+
+
+def _score(guesses_log10):
+    score = 0
+    for threshold in _SCORE_THRESHOLDS:
+        if guesses_log10 >= threshold:
+            score += 1
+    return score
+
+
+def analyze_password(password: str) -> dict:
+    """
+    Estimates how hard a concrete password is to guess. Looks for dictionary
+    words, keyboard walks, repeats, sequences and dates, then finds the
+    cheapest combination of those patterns (plus brute force for whatever
+    is left). Returns the estimated guesses (log10 and rounded), a score
+    from 0 (Very Weak) to 4 (Strong), the patterns that were used and how
+    often the password appears in the breach database (None when breach
+    checks aren't configured; a breached password always scores 0).
+    """
+    if not isinstance(password, str):
+        raise ValueError("Password must be a string.")
+
+    analyzed = password[:MAX_ANALYZED_LENGTH]
+    matches = []
+    if analyzed:
+        matches.extend(_dictionary_matches(analyzed))
+        matches.extend(_keyboard_walk_matches(analyzed))
+        matches.extend(_repeat_matches(analyzed))
+        matches.extend(_sequence_matches(analyzed))
+        matches.extend(_date_matches(analyzed))
+
+    guesses_log10, sequence = _minimum_guess_cover(analyzed, matches)
+    if len(password) > len(analyzed):
+        # Anything past the analyzed prefix counts as brute force
+        guesses_log10 += (len(password) - len(analyzed)) * math.log10(
+            _cardinality(password))
+
+    # A breached password is among an attacker's very first guesses
+    breached = breach_count(password)
+    if breached:
+        guesses_log10 = 0.0
+
+    return {
+        'length': len(password),
+        'guesses_log10': round(guesses_log10, 3),
+        'guesses': round(10**min(guesses_log10, 300)),
+        'score': _score(guesses_log10),
+        'breach_count': breached,
+        'sequence': sequence
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    samples = [
+        "password", "P@ssw0rd", "qwertyuiop", "aaaaaaaa", "abcabcabc",
+        "abcdef123", "1990-04-21", "correcthorsebatterystaple",
+        "tiger-ocean-lemon-7", "h7#Kp2!vQz@9"
+    ]
+    for sample in samples:
+        result = analyze_password(sample)
+        patterns = ", ".join(
+            f"{m['pattern']}:{m['token']}" for m in result['sequence'])
+        print(f"{sample:<28} score={result['score']} "
+              f"log10(guesses)={result['guesses_log10']:<7} {patterns}")
+
+    runs = 2000
+    started = time.perf_counter()
+    for _ in range(runs):
+        for sample in samples:
+            analyze_password(sample)
+    elapsed = time.perf_counter() - started
+    print(f"\nAverage latency: {elapsed / (runs * len(samples)) * 1e6:.0f} us")
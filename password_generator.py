@@ -1,152 +1,305 @@
 # password_generator.py
-import random
 import string
+from collections.abc import Sequence
 
-# Global variable to store loaded wordlists to avoid re-loading
-_WORDLISTS = {}
-
-
-# Function to load wordlist
-def load_wordlist(filepath="eff_long_wordlist.txt"):
-    # Use a dictionary to cache loaded wordlists
-    if filepath in _WORDLISTS:
-        return _WORDLISTS[filepath]
-
-    try:
-        with open(filepath, 'r') as f:
-            words = [line.strip() for line in f if line.strip()]
-        if not words:
-            raise ValueError(
-                f"Wordlist file '{filepath}' is empty or could not be read.")
-        _WORDLISTS[filepath] = words  # Cache the loaded wordlist
-        return words
-    except FileNotFoundError:
-        # Create dummy wordlists if not found for demonstration purposes
-        print(
-            f"Warning: Wordlist file not found at: {filepath}. Using a dummy wordlist."
-        )
-        if filepath == "eff_long_wordlist.txt":
-            dummy_words = [
-                "apple", "banana", "cherry", "date", "elephant", "flower",
-                "garden", "happiness", "internet", "jungle", "kangaroo",
-                "lemon", "mountain", "night", "ocean", "penguin", "queen",
-                "rainbow", "sunshine", "tiger", "umbrella", "violet",
-                "whisper", "xylophone", "yellow", "zebra"
-            ]
-        elif filepath == "eff_short_wordlist.txt":
-            dummy_words = [
-                "cat", "dog", "bird", "fish", "tree", "rock", "sky", "moon",
-                "star", "cloud"
-            ]
-        else:
-            dummy_words = ["word1", "word2", "word3"]  # Generic fallback
-
-        _WORDLISTS[filepath] = dummy_words  # Cache the dummy wordlist
-        return dummy_words
-    except Exception as e:
-        raise IOError(f"Error loading wordlist: {e}")
-
-
-# Load default wordlist globally once (if not already loaded by a specific request)
-try:
-    if "eff_long_wordlist.txt" not in _WORDLISTS:
-        _WORDLISTS["eff_long_wordlist.txt"] = load_wordlist(
-            "eff_long_wordlist.txt")
-except (FileNotFoundError, ValueError, IOError) as e:
-    print(
-        f"Initial warning: Could not load default wordlist for passphrase generation. Passphrase option might use dummy data: {e}"
-    )
+from binary_wordlist import MappedWordlist
+from blocklist_filter import get_blocklist
+from bounded_cache import BoundedLRUCache, MISSING
+from breach_lookup import get_breach_database
+from dictionary_index import get_dictionary_index
+from entropy_pool import get_thread_rng
+from password_prefetch import get_prefetcher
+from wordlist_registry import get_wordlist
 
 # Expanded ambiguous characters list
 AMBIGUOUS_CHARS = 'Il1Lo0O|[]{}()/\'"`~,.;:<> '
 
+# Symbols a passphrase may include
+PASSPHRASE_SYMBOLS = '!@#$%^&*()-_=+'
+
+
+# Maximum number of compiled policies kept in memory
+POLICY_CACHE_SIZE = 512
+
+_POLICY_CACHE = BoundedLRUCache(maxsize=POLICY_CACHE_SIZE)
+
+# Rejection filters: dictionary words at least this long are rejected
+DICTIONARY_REJECT_MIN_LENGTH = 4
+DICTIONARY_REJECT_WORDLIST = "eff_long_wordlist.txt"
+# Give up (instead of looping forever) when filters reject this many drafts
+MAX_REJECTION_ATTEMPTS = 1000
+
+
+class GenerationPolicy:
+    """
+    Compiled form of the generate_password options: the final alphabet after
+    exclusions, the per-type alphabets used by require_min_char_types and
+    the rejection filters generated passwords must pass.
+    Policies are immutable and shared, so build them with compile_policy().
+    """
+    __slots__ = ('key', 'length', 'alphabet', 'required_alphabets',
+                 'require_min_char_types', 'no_repeating_chars',
+                 'reject_dictionary_words', 'reject_breached', 'blocklist')
+
+    def __init__(self, key, length, alphabet, required_alphabets,
+                 require_min_char_types, no_repeating_chars,
+                 reject_dictionary_words=False, reject_breached=False,
+                 blocklist=None):
+        self.key = key
+        self.length = length
+        self.alphabet = alphabet
+        self.required_alphabets = required_alphabets
+        self.require_min_char_types = require_min_char_types
+        self.no_repeating_chars = no_repeating_chars
+        self.reject_dictionary_words = reject_dictionary_words
+        self.reject_breached = reject_breached
+        self.blocklist = blocklist
+
+    def __repr__(self):
+        return f"GenerationPolicy(length={self.length}, alphabet={self.alphabet!r})"
+
+    @property
+    def has_filters(self):
+        return (self.reject_dictionary_words or self.reject_breached
+                or self.blocklist is not None)
+
+    def is_acceptable(self, password):
+        """False if a rejection filter of this policy matches the password."""
+        if self.blocklist is not None and password in self.blocklist:
+            return False
+        if self.reject_dictionary_words and get_dictionary_index(
+                DICTIONARY_REJECT_WORDLIST).contains_word(
+                    password, DICTIONARY_REJECT_MIN_LENGTH):
+            return False
+        if self.reject_breached and get_breach_database().count(password):
+            return False
+        return True
+
+    def generate(self, rng=None):
+        # Each thread draws from its own pool unless an RNG is injected
+        rng = rng or get_thread_rng()
+        if not self.has_filters:
+            return self._draw(rng)
+        # Filtered policies: draw again until a password passes
+        for _ in range(MAX_REJECTION_ATTEMPTS):
+            password = self._draw(rng)
+            if self.is_acceptable(password):
+                return password
+        raise ValueError(
+            "Could not generate a password that passes the configured filters. Please adjust your criteria."
+        )
 
-def generate_password(length=12,
-                      include_uppercase=True,
-                      include_lowercase=True,
-                      include_digits=True,
-                      include_symbols=True,
-                      exclude_ambiguous=False,
-                      exclude_custom_chars='',
-                      custom_character_set='',
-                      require_min_char_types=False,
-                      no_repeating_chars=False):
+    def _draw(self, rng):
+        # Uniform over every password the policy allows: each character is a
+        # single bounded draw, and require_min_char_types is enforced by
+        # drawing the whole password again (as the vectorized engine does).
+        while True:
+            password = self._draw_sequence(rng)
+            if not self.require_min_char_types or all(
+                    any(char in chars for char in password)
+                    for chars in self.required_alphabets):
+                return password
+
+    def _draw_sequence(self, rng):
+        characters = self.alphabet
+        n = len(characters)
+        if not self.no_repeating_chars or n < 2:
+            return "".join(
+                characters[rng.randbelow(n)] for _ in range(self.length))
+
+        # No immediate repeats: draw from the n - 1 characters other than
+        # the previous one, mapping the draw past the previous index.
+        previous = rng.randbelow(n)
+        indices = [previous]
+        for _ in range(self.length - 1):
+            index = rng.randbelow(n - 1)
+            if index >= previous:
+                index += 1
+            indices.append(index)
+            previous = index
+        return "".join(characters[index] for index in indices)
+
+    def generate_batch(self, count, rng=None):
+        """
+        Generates `count` passwords, using the numpy engine when available
+        and falling back to one-at-a-time generation otherwise.
+        """
+        import vectorized_engine  # Deferred: pulls in numpy
+        rng = rng or get_thread_rng()
+        if not vectorized_engine.is_available():
+            return [self.generate(rng) for _ in range(count)]
+
+        passwords = vectorized_engine.generate_batch(self, count,
+                                                     rng.random_bytes)
+        if self.has_filters:
+            # Rejections are rare, so redraw them one at a time
+            for i, password in enumerate(passwords):
+                if not self.is_acceptable(password):
+                    passwords[i] = self.generate(rng)
+        return passwords
+
+
+def _policy_key(length, include_uppercase, include_lowercase, include_digits,
+                include_symbols, exclude_ambiguous, exclude_custom_chars,
+                custom_character_set, require_min_char_types,
+                no_repeating_chars, reject_dictionary_words, reject_breached):
+    # Normalize options so equivalent requests share one compiled policy
+    if custom_character_set:
+        # Character type flags (and the per-type requirement) don't apply
+        # to custom sets; keep the set's order but drop duplicates.
+        custom_character_set = "".join(dict.fromkeys(custom_character_set))
+        include_uppercase = include_lowercase = False
+        include_digits = include_symbols = False
+        require_min_char_types = False
+    return (int(length), bool(include_uppercase), bool(include_lowercase),
+            bool(include_digits), bool(include_symbols),
+            bool(exclude_ambiguous),
+            "".join(sorted(set(exclude_custom_chars or ''))),
+            custom_character_set or '', bool(require_min_char_types),
+            bool(no_repeating_chars), bool(reject_dictionary_words),
+            bool(reject_breached))
+
+
+def _compile_policy(key):
+    (length, include_uppercase, include_lowercase, include_digits,
+     include_symbols, exclude_ambiguous, exclude_custom_chars,
+     custom_character_set, require_min_char_types, no_repeating_chars,
+     reject_dictionary_words, reject_breached) = key
+
+    excluded = set(exclude_custom_chars)
+    if exclude_ambiguous:
+        excluded.update(AMBIGUOUS_CHARS)
 
-    characters = ""
+    selected_types = []
     if custom_character_set:
-        characters = custom_character_set
+        selected_types.append(custom_character_set)
     else:
         if include_uppercase:
-            characters += string.ascii_uppercase
+            selected_types.append(string.ascii_uppercase)
         if include_lowercase:
-            characters += string.ascii_lowercase
+            selected_types.append(string.ascii_lowercase)
         if include_digits:
-            characters += string.digits
+            selected_types.append(string.digits)
         if include_symbols:
-            characters += string.punctuation
+            selected_types.append(string.punctuation)
 
-    if not characters:
+    if not selected_types:
         raise ValueError(
             "No character types selected for password generation.")
 
-    # Apply exclusions
-    if exclude_ambiguous:
-        for char in AMBIGUOUS_CHARS:
-            characters = characters.replace(char, '')
-    if exclude_custom_chars:
-        for char in exclude_custom_chars:
-            characters = characters.replace(char, '')
+    # Apply exclusions once, per character type
+    type_alphabets = [
+        "".join(char for char in chars if char not in excluded)
+        for chars in selected_types
+    ]
+    alphabet = "".join(type_alphabets)
 
-    if not characters:
+    if not alphabet:
         raise ValueError(
             "Character set became empty after exclusions. Please adjust your criteria."
         )
 
-    password_list = []
-    required_chars = []  # To hold at least one of each required type
-
-    # Implement require_min_char_types logic
-    if require_min_char_types and not custom_character_set:
-        if include_uppercase:
-            required_chars.append(random.choice(string.ascii_uppercase))
-        if include_lowercase:
-            required_chars.append(random.choice(string.ascii_lowercase))
-        if include_digits:
-            required_chars.append(random.choice(string.digits))
-        if include_symbols:
-            required_chars.append(random.choice(string.punctuation))
-
+    required_alphabets = ()
+    if require_min_char_types:
+        # Types that were fully excluded can't be required
+        required_alphabets = tuple(chars for chars in type_alphabets if chars)
         # Ensure password length is sufficient for required chars
-        if length < len(required_chars):
+        if length < len(required_alphabets):
             raise ValueError(
                 "Password length is too short to include at least one of each selected character type."
             )
 
-        # Add required characters to the password list and shuffle them
-        password_list.extend(required_chars)
-        random.shuffle(password_list)  # Shuffle to randomize positions
-
-    last_char = ''  # For no_repeating_chars logic
-
-    # Fill the rest of the password length
-    while len(password_list) < length:
-        char = random.choice(characters)
-        # Implement no_repeating_chars logic
-        if no_repeating_chars:
-            attempts = 0
-            while char == last_char and len(characters) > 1 and attempts < 10:
-                char = random.choice(characters)
-                attempts += 1
-
-        password_list.append(char)
-        last_char = char
-
-    password = "".join(password_list[:length])
+    if reject_breached and get_breach_database() is None:
+        raise ValueError(
+            "Breached-password checks are not configured on this server.")
+
+    # The common-password blocklist, when configured, applies to every policy
+    return GenerationPolicy(key, length, alphabet, required_alphabets,
+                            require_min_char_types, no_repeating_chars,
+                            reject_dictionary_words, reject_breached,
+                            get_blocklist())
+
+
+def compile_policy(length=12,
+                   include_uppercase=True,
+                   include_lowercase=True,
+                   include_digits=True,
+                   include_symbols=True,
+                   exclude_ambiguous=False,
+                   exclude_custom_chars='',
+                   custom_character_set='',
+                   require_min_char_types=False,
+                   no_repeating_chars=False,
+                   reject_dictionary_words=False,
+                   reject_breached=False):
+    """
+    Returns the compiled GenerationPolicy for the given options, reusing a
+    cached one when the same (normalized) options were compiled before.
+    Raises ValueError for invalid options; that result is cached too.
+    """
+    key = _policy_key(length, include_uppercase, include_lowercase,
+                      include_digits, include_symbols, exclude_ambiguous,
+                      exclude_custom_chars, custom_character_set,
+                      require_min_char_types, no_repeating_chars,
+                      reject_dictionary_words, reject_breached)
+
+    cached = _POLICY_CACHE.get(key)
+    if cached is MISSING:
+        try:
+            cached = _compile_policy(key)
+        except ValueError as e:
+            cached = e
+        _POLICY_CACHE.put(key, cached)
+
+    if isinstance(cached, ValueError):
+        raise ValueError(str(cached))
+    return cached
+
+
+def get_policy_cache_stats():
+    return _POLICY_CACHE.stats()
 
-    if require_min_char_types:
-        password = "".join(random.sample(password, len(password)))
 
-    return password
+def generate_password(length=12,
+                      include_uppercase=True,
+                      include_lowercase=True,
+                      include_digits=True,
+                      include_symbols=True,
+                      exclude_ambiguous=False,
+                      exclude_custom_chars='',
+                      custom_character_set='',
+                      require_min_char_types=False,
+                      no_repeating_chars=False,
+                      reject_dictionary_words=False,
+                      reject_breached=False,
+                      rng=None):
+
+    policy = compile_policy(length=length,
+                            include_uppercase=include_uppercase,
+                            include_lowercase=include_lowercase,
+                            include_digits=include_digits,
+                            include_symbols=include_symbols,
+                            exclude_ambiguous=exclude_ambiguous,
+                            exclude_custom_chars=exclude_custom_chars,
+                            custom_character_set=custom_character_set,
+                            require_min_char_types=require_min_char_types,
+                            no_repeating_chars=no_repeating_chars,
+                            reject_dictionary_words=reject_dictionary_words,
+                            reject_breached=reject_breached)
+    return generate_from_policy(policy, rng)
+
+
+def generate_from_policy(policy, rng=None):
+    """Generates one password for an already compiled GenerationPolicy."""
+    if rng is None:
+        # Serve from the prefetch buffers when enabled (injected RNGs always
+        # draw directly, so seeded callers stay reproducible)
+        prefetcher = get_prefetcher()
+        if prefetcher is not None:
+            password = prefetcher.take(policy)
+            if password is not None:
+                return password
+    return policy.generate(rng)
 
 
 def generate_passphrase(
@@ -156,155 +309,171 @@ def generate_passphrase(
     include_symbol=True,
     wordlist_name="eff_long_wordlist.txt",  # Existing
     capitalization="none",  # NEW: Capitalization option (none, first, all, random)
-    placement="random"):  # NEW: Placement option (random, start, end)
+    placement="random",  # NEW: Placement option (random, start, end)
+    rng=None):  # Random source; defaults to the calling thread's pool
+
+    rng = rng or get_thread_rng()
+    variants = _passphrase_variants(wordlist_name, num_words)
+
+    blocklist = get_blocklist()
+    for _ in range(MAX_REJECTION_ATTEMPTS):
+        passphrase = _draw_passphrase(rng, variants, num_words, separator,
+                                      include_digit, include_symbol,
+                                      capitalization, placement)
+        # Draw again if the passphrase is on the common-password blocklist
+        if blocklist is None or passphrase not in blocklist:
+            return passphrase
+    raise ValueError(
+        "Could not generate a passphrase that passes the configured filters. Please adjust your criteria."
+    )
+
 
-    WORDLIST = load_wordlist(wordlist_name)
+def generate_passphrase_batch(count,
+                              num_words=4,
+                              separator='-',
+                              include_digit=True,
+                              include_symbol=True,
+                              wordlist_name="eff_long_wordlist.txt",
+                              capitalization="none",
+                              placement="random",
+                              rng=None):
+    """
+    Generates `count` passphrases with generate_passphrase()'s options,
+    drawing all of them in one vectorized step when numpy is available.
+    """
+    import vectorized_engine  # Deferred: pulls in numpy
+    rng = rng or get_thread_rng()
+    variants = _passphrase_variants(wordlist_name, num_words)
+    options = (num_words, separator, include_digit, include_symbol,
+               capitalization, placement)
+    if not vectorized_engine.is_available():
+        return [
+            generate_passphrase(num_words, separator, include_digit,
+                                include_symbol, wordlist_name,
+                                capitalization, placement, rng)
+            for _ in range(count)
+        ]
+
+    passphrases = vectorized_engine.generate_passphrase_batch(
+        variants, count, *options, random_bytes=rng.random_bytes)
+    blocklist = get_blocklist()
+    if blocklist is not None:
+        # Hits are rare, so redraw them one at a time
+        for i, passphrase in enumerate(passphrases):
+            if passphrase in blocklist:
+                passphrases[i] = generate_passphrase(
+                    num_words, separator, include_digit, include_symbol,
+                    wordlist_name, capitalization, placement, rng)
+    return passphrases
+
+
+class _CaseView(Sequence):
+    """A wordlist with `transform` applied to each word as it is read."""
+    __slots__ = ('_words', '_transform')
+
+    def __init__(self, words, transform):
+        self._words = words
+        self._transform = transform
+
+    def __len__(self):
+        return len(self._words)
+
+    def __getitem__(self, index):
+        return self._transform(self._words[index])
+
+
+class PassphraseVariants:
+    """
+    The lowercase, capitalized and uppercase form of every word in a
+    wordlist, computed once per wordlist so drawing a word is a lookup.
+    Memory-mapped wordlists aren't copied onto the heap: their variants are
+    views that transform only the words actually drawn (`precomputed` is
+    False).
+    """
+    __slots__ = ('lower', 'capitalized', 'upper', 'size', 'precomputed')
+
+    def __init__(self, words):
+        self.precomputed = not isinstance(words, MappedWordlist)
+        if self.precomputed:
+            self.lower = [word.lower() for word in words]
+            self.capitalized = [word.capitalize() for word in words]
+            self.upper = [word.upper() for word in words]
+        else:
+            self.lower = _CaseView(words, str.lower)
+            self.capitalized = _CaseView(words, str.capitalize)
+            self.upper = _CaseView(words, str.upper)
+        self.size = len(self.lower)
+
+    def table(self, capitalization):
+        """Variant list for a fixed capitalization (not 'random')."""
+        if capitalization == "first":
+            return self.capitalized
+        if capitalization == "all":
+            return self.upper
+        return self.lower  # "none" or any other value
 
-    if not WORDLIST:
+
+def _passphrase_variants(wordlist_name, num_words):
+    entry = get_wordlist(wordlist_name)
+    if not entry.size:
         raise ValueError("Wordlist not loaded. Cannot generate passphrase.")
     if num_words <= 0:
         raise ValueError("Number of words must be positive.")
+    return entry.get_derived('passphrase_variants',
+                             lambda: PassphraseVariants(entry.words))
+
+
+def _draw_passphrase(rng, variants, num_words, separator, include_digit,
+                     include_symbol, capitalization, placement):
+    size = variants.size
+    if capitalization == "random":
+        # Randomly capitalize first letter or keep as is
+        tables = (variants.lower, variants.capitalized)
+        words = [
+            tables[rng.randbelow(2)][rng.randbelow(size)]
+            for _ in range(num_words)
+        ]
+    else:
+        table = variants.table(capitalization)
+        words = [table[rng.randbelow(size)] for _ in range(num_words)]
 
-    passphrase_parts = [random.choice(WORDLIST) for _ in range(num_words)]
-
-    # NEW: Apply capitalization rules
-    processed_words = []
-    for word in passphrase_parts:
-        if capitalization == "first":
-            processed_words.append(word.capitalize())
-        elif capitalization == "all":
-            processed_words.append(word.upper())
-        elif capitalization == "random":
-            # Randomly capitalize first letter or keep as is
-            if random.choice([True, False]):
-                processed_words.append(word.capitalize())
-            else:
-                processed_words.append(
-                    word.lower())  # Ensure lowercase if not capitalized
-        else:  # "none" or any other value
-            processed_words.append(
-                word.lower())  # Ensure all lowercase by default
-
-    passphrase_elements = list(
-        processed_words)  # Convert to list for mutable operations
-
-    # NEW: Handle digit and symbol insertion based on placement
-    digit_to_insert = str(random.randint(0, 9)) if include_digit else None
-    symbol_to_insert = random.choice(
-        '!@#$%^&*()-_=+') if include_symbol else None
-
-    # Determine insertion positions
-    digit_pos = -1
-    symbol_pos = -1
+    # Handle digit and symbol insertion based on placement
+    extras = []
+    if include_digit:
+        extras.append(str(rng.randint(0, 9)))
+    if include_symbol:
+        extras.append(rng.choice(PASSPHRASE_SYMBOLS))
 
     if placement == "start":
-        if digit_to_insert:
-            passphrase_elements.insert(0, digit_to_insert)
-            digit_pos = 0
-        if symbol_to_insert:
-            # If digit was inserted at start, symbol goes after it
-            passphrase_elements.insert(1 if digit_to_insert else 0,
-                                       symbol_to_insert)
-            symbol_pos = 1 if digit_to_insert else 0
-    elif placement == "end":
-        if symbol_to_insert:  # Symbol first, so digit can go before it if both exist
-            passphrase_elements.append(symbol_to_insert)
-            symbol_pos = len(passphrase_elements) - 1
-        if digit_to_insert:
-            passphrase_elements.append(digit_to_insert)
-            digit_pos = len(passphrase_elements) - 1
-    else:  # "random"
-        if digit_to_insert:
-            # Insert digit at a random position within the current elements
-            insert_pos = random.randint(0, len(passphrase_elements))
-            passphrase_elements.insert(insert_pos, digit_to_insert)
-            digit_pos = insert_pos
-
-        if symbol_to_insert:
-            # Insert symbol at a random position, avoiding the digit's position if possible
-            # and ensuring it's within the new bounds
-            attempts = 0
-            while attempts < 10:  # Try a few times to get a different spot
-                insert_pos = random.randint(0, len(passphrase_elements))
-                if insert_pos != digit_pos or not digit_to_insert:  # If not same as digit, or no digit
-                    passphrase_elements.insert(insert_pos, symbol_to_insert)
-                    symbol_pos = insert_pos
-                    break
-                attempts += 1
-            if attempts == 10:  # If couldn't find a different spot after attempts, just insert
-                passphrase_elements.insert(
-                    random.randint(0, len(passphrase_elements)),
-                    symbol_to_insert)
-
-    passphrase = separator.join(passphrase_elements)
-    return passphrase
+        # Digit first, symbol right after it
+        return separator.join(extras + words)
+    if placement == "end":
+        # Symbol first, digit last
+        return separator.join(words + extras[::-1])
+
+    # "random": pick distinct slots among the final elements in one draw,
+    # uniform over every ordered placement. With both extras, k encodes the
+    # digit's slot (n + 2 choices) and the symbol's slot among the remaining
+    # n + 1.
+    total = num_words + len(extras)
+    if len(extras) == 2:
+        k = rng.randbelow(total * (total - 1))
+        first, second = divmod(k, total - 1)
+        if second >= first:
+            second += 1
+        slots = {first: extras[0], second: extras[1]}
+    elif extras:
+        slots = {rng.randbelow(total): extras[0]}
+    else:
+        return separator.join(words)
+    words = iter(words)
+    return separator.join(
+        [slots[i] if i in slots else next(words) for i in range(total)])
 
 
 if __name__ == "__main__":
-    print("--- Character Passwords (Advanced Features) ---")
-    print("Length 12, all types, no repeating:",
-          generate_password(length=12, no_repeating_chars=True))
-    print("Length 12, all types, min char types:",
-          generate_password(length=12, require_min_char_types=True))
-    print(
-        "Length 16, all types, no repeating, min char types:",
-        generate_password(length=16,
-                          no_repeating_chars=True,
-                          require_min_char_types=True))
-    print(
-        "Length 10, custom set 'abcABC123', no repeating:",
-        generate_password(length=10,
-                          custom_character_set='abcABC123',
-                          no_repeating_chars=True))
-    print("Length 12, all types, ambiguous excluded:",
-          generate_password(exclude_ambiguous=True))
-    print(
-        "Length 8, lower only:",
-        generate_password(length=8,
-                          include_uppercase=False,
-                          include_digits=False,
-                          include_symbols=False))
-
-    print("\n--- Passphrases (Wordlist, Capitalization, Placement) ---")
-    print(
-        "4 words, long wordlist, none cap, random placement:",
-        generate_passphrase(num_words=4,
-                            wordlist_name="eff_long_wordlist.txt",
-                            capitalization="none",
-                            placement="random"))
-    print(
-        "5 words, short wordlist, first cap, start placement:",
-        generate_passphrase(num_words=5,
-                            include_digit=True,
-                            include_symbol=True,
-                            wordlist_name="eff_short_wordlist.txt",
-                            capitalization="first",
-                            placement="start"))
-    print(
-        "6 words, long wordlist, all cap, end placement:",
-        generate_passphrase(num_words=6,
-                            include_digit=True,
-                            wordlist_name="eff_long_wordlist.txt",
-                            capitalization="all",
-                            placement="end"))
-    print(
-        "7 words, short wordlist, random cap, random placement:",
-        generate_passphrase(num_words=7,
-                            include_symbol=True,
-                            wordlist_name="eff_short_wordlist.txt",
-                            capitalization="random",
-                            placement="random"))
-    print(
-        "3 words, custom separator '_', long wordlist, none cap:",
-        generate_passphrase(num_words=3,
-                            separator='_',
-                            wordlist_name="eff_long_wordlist.txt",
-                            capitalization="none"))
-    print(
-        "4 words, short wordlist, all cap, start, digit+symbol:",
-        generate_passphrase(num_words=4,
-                            include_digit=True,
-                            include_symbol=True,
-                            wordlist_name="eff_short_wordlist.txt",
-                            capitalization="all",
-                            placement="start"))
+    # `python -m password_generator` is the command-line generator
+    import sys
+
+    from generator_cli import main
+    sys.exit(main())
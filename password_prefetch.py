@@ -0,0 +1,311 @@
+# password_prefetch.py
+#
+# Optional background prefetcher for generate_password(). It watches which
+# compiled policies requests use, keeps a ring buffer of ready passwords for
+# the most used ones and refills those buffers in bulk with the vectorized
+# engine, so a hot request is a pop instead of a fresh draw.
+#
+# Every buffered password is handed out exactly once: popping copies it out
+# and zeroes its slot, discarded buffers are zeroed too, and a forked child
+# starts with empty buffers instead of replaying its parent's.
+import os
+import threading
+import time
+
+# Policies that get a buffer, picked by recent use
+DEFAULT_MAX_POLICIES = 8
+# Passwords kept ready per policy
+DEFAULT_DEPTH = 1024
+# Refill once a buffer drops below this fraction of its depth
+DEFAULT_REFILL_BELOW = 0.5
+# Upper bound on the bytes held by all buffers together
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+# How often (seconds) usage is re-ranked; counts are halved each time so the
+# hot set follows shifting traffic
+RERANK_INTERVAL = 1.0
+# Distinct policies whose usage is tracked at once
+MAX_TRACKED_POLICIES = 256
+# Largest batch handed to the vectorized engine in one refill step; small
+# enough that the refill thread never holds the GIL for long
+REFILL_CHUNK = 512
+
+
+class _PasswordRing:
+    """
+    Fixed-size FIFO of encoded passwords in one preallocated bytearray.
+    Slots are sized for the policy's longest possible password.
+    """
+
+    def __init__(self, policy, depth):
+        self.policy = policy
+        self.depth = depth
+        self.slot_size = policy.length * max(
+            len(char.encode('utf-8')) for char in policy.alphabet)
+        self._buffer = bytearray(depth * self.slot_size)
+        self._lengths = [0] * depth
+        self._head = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return len(self._buffer)
+
+    def missing(self):
+        return self.depth - self.count
+
+    def push_many(self, passwords):
+        size = self.slot_size
+        with self._lock:
+            for password in passwords:
+                if self.count == self.depth:
+                    break
+                data = password.encode('utf-8')
+                slot = (self._head + self.count) % self.depth
+                self._buffer[slot * size:slot * size + len(data)] = data
+                self._lengths[slot] = len(data)
+                self.count += 1
+
+    def pop(self):
+        with self._lock:
+            if not self.count:
+                return None
+            slot = self._head
+            start = slot * self.slot_size
+            end = start + self._lengths[slot]
+            data = bytes(self._buffer[start:end])
+            self._buffer[start:end] = bytes(end - start)  # Wipe the slot
+            self._lengths[slot] = 0
+            self._head = (slot + 1) % self.depth
+            self.count -= 1
+        return data.decode('utf-8')
+
+    def wipe(self):
+        with self._lock:
+            self._buffer[:] = bytes(len(self._buffer))
+            self._lengths = [0] * self.depth
+            self._head = 0
+            self.count = 0
+
+
+class PasswordPrefetcher:
+    """
+    Keeps ready-made passwords for the `max_policies` most used policies.
+    `take(policy)` records the use and returns a buffered password, or None
+    when the policy isn't buffered (yet) or its buffer ran dry; callers then
+    generate one themselves. A daemon thread does all the refilling.
+    """
+
+    def __init__(self,
+                 max_policies=DEFAULT_MAX_POLICIES,
+                 depth=DEFAULT_DEPTH,
+                 refill_below=DEFAULT_REFILL_BELOW,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        if max_policies <= 0 or depth <= 0 or max_bytes <= 0:
+            raise ValueError("Prefetch limits must be positive.")
+        if not 0 < refill_below <= 1:
+            raise ValueError("Refill threshold must be between 0 and 1.")
+        self.max_policies = max_policies
+        self.depth = depth
+        self.refill_below = refill_below
+        self.max_bytes = max_bytes
+
+        self._rings = {}  # policy key -> _PasswordRing
+        self._usage = {}  # policy key -> [policy, recent use count]
+        self._usage_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+        self._last_rerank = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.refilled = 0
+        self.wiped = 0
+        self.refill_errors = 0
+
+    def take(self, policy):
+        key = policy.key
+        with self._usage_lock:
+            usage = self._usage.get(key)
+            if usage is None:
+                if len(self._usage) >= MAX_TRACKED_POLICIES:
+                    self._forget_coldest()
+                usage = self._usage[key] = [policy, 0]
+            usage[1] += 1
+        self._ensure_thread()
+
+        ring = self._rings.get(key)
+        password = ring.pop() if ring is not None else None
+        if password is None:
+            self.misses += 1
+            self._wake.set()
+            return None
+        self.hits += 1
+        if ring.count < ring.depth * self.refill_below:
+            self._wake.set()
+        return password
+
+    def _forget_coldest(self):
+        # Caller holds the usage lock; drops the least used untracked policy
+        candidates = [k for k in self._usage if k not in self._rings]
+        if candidates:
+            del self._usage[min(candidates, key=lambda k: self._usage[k][1])]
+
+    def _ensure_thread(self):
+        # Started on first use, and again in a forked child (threads don't
+        # survive fork)
+        if self._pid == os.getpid() or self._stopped:
+            return
+        with self._usage_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run,
+                                            name='password-prefetch',
+                                            daemon=True)
+            self._thread.start()
+
+    def _rerank(self):
+        with self._usage_lock:
+            ranked = sorted(self._usage.items(),
+                            key=lambda item: item[1][1],
+                            reverse=True)
+            hot = [(key, policy) for key, (policy, uses) in ranked
+                   if uses > 0][:self.max_policies]
+            for usage in self._usage.values():
+                usage[1] //= 2
+
+        hot_keys = {key for key, _ in hot}
+        for key in list(self._rings):
+            if key not in hot_keys:
+                self._rings.pop(key).wipe()
+                self.wiped += 1
+
+        # Split the memory cap evenly between the hot policies
+        for key, policy in hot:
+            if key in self._rings:
+                continue
+            slot_size = policy.length * max(
+                len(char.encode('utf-8')) for char in policy.alphabet)
+            depth = min(self.depth,
+                        self.max_bytes // (self.max_policies * slot_size))
+            if depth > 0:
+                self._rings[key] = _PasswordRing(policy, depth)
+
+    def _refill(self):
+        for ring in list(self._rings.values()):
+            if ring.count >= ring.depth * self.refill_below:
+                continue
+            while ring.missing() > 0 and not self._stopped:
+                try:
+                    passwords = ring.policy.generate_batch(
+                        min(ring.missing(), REFILL_CHUNK))
+                except ValueError:
+                    self.refill_errors += 1  # Filters rejected too much
+                    break
+                ring.push_many(passwords)
+                self.refilled += len(passwords)
+
+    def _run(self):
+        pid = os.getpid()
+        while not self._stopped and self._pid == pid:
+            self._wake.wait(RERANK_INTERVAL)
+            self._wake.clear()
+            now = time.monotonic()
+            if now - self._last_rerank >= RERANK_INTERVAL or not self._rings:
+                self._last_rerank = now
+                self._rerank()
+            self._refill()
+
+    def discard(self):
+        """Wipes every buffered password."""
+        for key in list(self._rings):
+            ring = self._rings.pop(key, None)
+            if ring is not None:
+                ring.wipe()
+                self.wiped += 1
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+        self.discard()
+
+    def _after_fork_in_child(self):
+        # The parent's buffered passwords must never be handed out twice
+        self._rings = {}
+        self._usage_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def stats(self):
+        rings = list(self._rings.values())
+        served = self.hits + self.misses
+        return {
+            'policies': len(rings),
+            'buffered': sum(ring.count for ring in rings),
+            'bytes': sum(ring.nbytes for ring in rings),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / served if served else 0.0,
+            'refilled': self.refilled,
+            'wiped': self.wiped,
+            'refill_errors': self.refill_errors
+        }
+
+
+_PREFETCHER = None
+
+
+def _after_fork_in_child():
+    if _PREFETCHER is not None:
+        _PREFETCHER._after_fork_in_child()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def enable_prefetch(**settings):
+    """
+    Turns the prefetcher on for generate_password() (replacing a running
+    one) and returns it. Takes the PasswordPrefetcher keyword arguments.
+    """
+    global _PREFETCHER
+    previous, _PREFETCHER = _PREFETCHER, PasswordPrefetcher(**settings)
+    if previous is not None:
+        previous.stop()
+    return _PREFETCHER
+
+
+def disable_prefetch():
+    global _PREFETCHER
+    previous, _PREFETCHER = _PREFETCHER, None
+    if previous is not None:
+        previous.stop()
+
+
+def get_prefetcher():
+    """Returns the active PasswordPrefetcher, or None when prefetch is off."""
+    return _PREFETCHER
+
+
+def enable_prefetch_from_env(environ=os.environ):
+    """
+    Enables prefetch when PASSWORD_PREFETCH_POLICIES is set (> 0), with
+    PASSWORD_PREFETCH_DEPTH, PASSWORD_PREFETCH_REFILL_BELOW and
+    PASSWORD_PREFETCH_MAX_BYTES overriding the defaults.
+    """
+    policies = int(environ.get('PASSWORD_PREFETCH_POLICIES', 0))
+    if policies <= 0:
+        return None
+    return enable_prefetch(
+        max_policies=policies,
+        depth=int(environ.get('PASSWORD_PREFETCH_DEPTH', DEFAULT_DEPTH)),
+        refill_below=float(
+            environ.get('PASSWORD_PREFETCH_REFILL_BELOW',
+                        DEFAULT_REFILL_BELOW)),
+        max_bytes=int(
+            environ.get('PASSWORD_PREFETCH_MAX_BYTES', DEFAULT_MAX_BYTES)))
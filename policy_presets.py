@@ -0,0 +1,177 @@
+# policy_presets.py
+#
+# Named generation policies, defined once on the server and referenced by
+# clients as {"policy": "db-service-account"} instead of a full option set.
+# Presets are read from a JSON file (PASSWORD_POLICY_PRESETS_PATH):
+#
+#   {
+#     "presets_only": false,
+#     "presets": {
+#       "db-service-account": {"type": "password", "length": 30,
+#                              "require_min_char_types": true,
+#                              "max_count": 10000},
+#       "team-passphrase": {"type": "passphrase", "num_words": 6}
+#     }
+#   }
+#
+# Each preset takes the same options as a /generate request, is validated
+# and compiled once at load time and stays pinned in memory, so serving it
+# is a dictionary lookup. With "presets_only" ad-hoc option sets are
+# refused, which lets ops enforce org-wide rules in one place.
+#
+# The file is watched by mtime: every process rereads it at most once per
+# RELOAD_INTERVAL seconds after it changed, and swaps the new presets in
+# atomically. A file that fails to load keeps the previous presets in
+# service (the error shows up in stats()).
+import json
+import os
+import threading
+import time
+
+PRESETS_ENV = 'PASSWORD_POLICY_PRESETS_PATH'
+# Seconds between checks of the preset file for changes
+RELOAD_INTERVAL = 2.0
+
+
+class Preset:
+    """
+    A compiled preset: `generate()` returns one item, `generate_batch(n)` a
+    list of n, and the strength assessment is computed once.
+    """
+    __slots__ = ('name', 'type', 'options', 'generate', 'generate_batch',
+                 'ai_strength_score', 'charset_recommendation', 'max_count')
+
+    def __init__(self, name, generation_type, options, generate,
+                 generate_batch, ai_strength_score, charset_recommendation,
+                 max_count):
+        self.name = name
+        self.type = generation_type
+        self.options = options
+        self.generate = generate
+        self.generate_batch = generate_batch
+        self.ai_strength_score = ai_strength_score
+        self.charset_recommendation = charset_recommendation
+        self.max_count = max_count
+
+    def describe(self):
+        return {
+            'type': self.type,
+            'options': self.options,
+            'max_count': self.max_count,
+            'ai_strength_score': self.ai_strength_score
+        }
+
+
+class PolicyPresets:
+    """
+    Registry of the presets in `path`. `compile_preset(name, spec)` turns
+    one preset's JSON object into a Preset, raising ValueError when it is
+    invalid. With no path the registry stays empty and get() reports that
+    named policies aren't configured.
+    """
+
+    def __init__(self, path, compile_preset, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.compile_preset = compile_preset
+        self.reload_interval = reload_interval
+        self._presets = {}
+        self._presets_only = False
+        self._version = None  # (mtime_ns, size) of the loaded file
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self.loads = 0
+        self.reload_errors = 0
+        self.last_error = None
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _read(self):
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            try:
+                config = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"Policy presets file is not valid JSON: {e}")
+        if not isinstance(config, dict) or not isinstance(
+                config.get('presets', {}), dict):
+            raise ValueError(
+                "Policy presets file must hold an object with a 'presets' object."
+            )
+
+        presets = {}
+        for name, spec in config.get('presets', {}).items():
+            if not isinstance(spec, dict):
+                raise ValueError(f"Policy '{name}' must be an object.")
+            try:
+                presets[name] = self.compile_preset(name, spec)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Policy '{name}' is invalid: {e}")
+        return presets, bool(config.get('presets_only', False)), (
+            stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        """
+        (Re)reads the preset file and swaps the new presets in. Raises
+        OSError or ValueError (keeping the current presets) when it can't.
+        """
+        if not self.enabled:
+            return
+        presets, presets_only, version = self._read()
+        # One assignment each, so requests see either the old or new set
+        self._presets, self._presets_only = presets, presets_only
+        self._version = version
+        self.loads += 1
+        self.last_error = None
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check or not self._reload_lock.acquire(
+                blocking=False):
+            return
+        try:
+            self._next_check = now + self.reload_interval
+            try:
+                stat = os.stat(self.path)
+                if (stat.st_mtime_ns, stat.st_size) != self._version:
+                    self.load()
+            except (OSError, ValueError) as e:
+                self.reload_errors += 1
+                self.last_error = str(e)
+        finally:
+            self._reload_lock.release()
+
+    def get(self, name):
+        """Returns the Preset called `name`; ValueError if there is none."""
+        if not self.enabled:
+            raise ValueError("Named policies are not configured on this server.")
+        self._maybe_reload()
+        preset = self._presets.get(name) if isinstance(name, str) else None
+        if preset is None:
+            raise ValueError(f"Unknown policy '{name}'.")
+        return preset
+
+    @property
+    def presets_only(self):
+        if self.enabled:
+            self._maybe_reload()
+        return self._presets_only
+
+    def describe(self):
+        if self.enabled:
+            self._maybe_reload()
+        return {
+            name: preset.describe()
+            for name, preset in sorted(self._presets.items())
+        }
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'presets': len(self._presets),
+            'presets_only': self._presets_only,
+            'loads': self.loads,
+            'reload_errors': self.reload_errors,
+            'last_error': self.last_error
+        }
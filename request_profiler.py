@@ -0,0 +1,181 @@
+# request_profiler.py
+#
+# Opt-in cProfile sampling of API requests, for chasing slow requests that
+# don't reproduce locally. Profiling is configured at startup:
+#
+#   PROFILE_SAMPLE_RATE   fraction of requests to profile (0 to 1)
+#   PROFILE_ADMIN_TOKEN   enables the admin endpoints, and profiling of any
+#                         request sent with X-Profile-Request: 1 plus
+#                         X-Admin-Token: <token>
+#
+# With neither set, profile_view() hands the view back unwrapped, so a
+# disabled profiler adds no work at all to a request. Profiles are merged per
+# (route, generation type) and can be downloaded as pstats data or as
+# collapsed stacks for flame graph tools. cProfile and pstats are only
+# imported once a request is actually profiled.
+import functools
+import hmac
+import marshal
+import os
+import random
+import threading
+
+SAMPLE_RATE = min(1.0, max(0.0,
+                           float(os.environ.get('PROFILE_SAMPLE_RATE', 0))))
+ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN', '')
+ENABLED = SAMPLE_RATE > 0 or bool(ADMIN_TOKEN)
+
+PROFILE_HEADER = 'X-Profile-Request'
+TOKEN_HEADER = 'X-Admin-Token'
+
+# Collapsed stacks deeper than this are cut off (recursion, huge call trees)
+MAX_STACK_DEPTH = 64
+
+_PROFILES = {}  # (route, generation type) -> [pstats.Stats, request count]
+_LOCK = threading.Lock()
+
+
+def is_admin(headers):
+    """True if the request carries the configured admin token."""
+    token = headers.get(TOKEN_HEADER, '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(
+        token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+
+def _should_profile(headers):
+    if headers.get(PROFILE_HEADER) == '1' and is_admin(headers):
+        return True
+    return SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+
+
+def _record(key, profiler):
+    import pstats
+    with _LOCK:
+        entry = _PROFILES.get(key)
+        if entry is None:
+            _PROFILES[key] = [pstats.Stats(profiler), 1]
+        else:
+            entry[0].add(profiler)
+            entry[1] += 1
+
+
+def profile_view(route, request, label):
+    """
+    Decorator for a Flask view: profiles the sampled requests and files the
+    profile under (route, label(request)). Returns the view untouched when
+    profiling is disabled.
+    """
+
+    def decorator(view):
+        if not ENABLED:
+            return view
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _should_profile(request.headers):
+                return view(*args, **kwargs)
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # Another profiler is active on this thread
+                return view(*args, **kwargs)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                profiler.disable()
+                _record((route, label(request)), profiler)
+
+        return wrapper
+
+    return decorator
+
+
+def summary():
+    """Profiled request counts and total profiled time per key."""
+    with _LOCK:
+        return [{
+            'route': route,
+            'type': generation_type,
+            'requests': count,
+            'total_seconds': stats.total_tt
+        } for (route, generation_type), (stats, count) in sorted(
+            _PROFILES.items())]
+
+
+def reset():
+    with _LOCK:
+        _PROFILES.clear()
+
+
+def _get_stats(route, generation_type):
+    with _LOCK:
+        entry = _PROFILES.get((route, generation_type))
+        if entry is None:
+            return None
+        # Copy, so the export doesn't race with requests still adding to it
+        return dict(entry[0].stats)
+
+
+def export_pstats(route, generation_type):
+    """
+    Returns the merged profile in the binary format pstats.Stats loads
+    (what Profile.dump_stats writes), or None if nothing was recorded.
+    """
+    stats = _get_stats(route, generation_type)
+    return None if stats is None else marshal.dumps(stats)
+
+
+def _frame_label(func):
+    filename, lineno, name = func
+    if filename == '~':  # Built-in function
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{lineno})"
+    return label.replace(';', ':')
+
+
+def export_collapsed(route, generation_type):
+    """
+    Returns the merged profile as collapsed stacks ("a;b;c microseconds" per
+    line), or None if nothing was recorded. cProfile keeps caller/callee
+    pairs rather than full stacks, so each function's time is split between
+    the paths reaching it in proportion to the time each caller spent in it.
+    """
+    stats = _get_stats(route, generation_type)
+    if stats is None:
+        return None
+
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, entry in stats.items() if not entry[4]]
+
+    totals = {}
+
+    def walk(func, path, share):
+        # `share` is the fraction of func's total time spent on this path
+        path = path + (_frame_label(func), )
+        own = stats[func][2] * share
+        if own > 0:
+            totals[path] = totals.get(path, 0.0) + own
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_total = stats[callee][3]
+            if callee_total <= 0 or _frame_label(callee) in path:
+                continue  # No time, or recursion already on this path
+            child_share = edge_time * share / callee_total
+            if child_share * callee_total >= 1e-6:
+                walk(callee, path, child_share)
+
+    for root in roots:
+        walk(root, (), 1.0)
+
+    lines = [
+        f"{';'.join(path)} {round(seconds * 1e6)}"
+        for path, seconds in sorted(totals.items())
+        if round(seconds * 1e6) > 0
+    ]
+    return '\n'.join(lines) + '\n'
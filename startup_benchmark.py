@@ -0,0 +1,174 @@
+# startup_benchmark.py
+#
+# Startup cost of the API: how long `import app` and create_app() take, and
+# how long the first requests of a fresh process take with and without the
+# warm-up, e.g.
+#
+#   python startup_benchmark.py
+#   python startup_benchmark.py --gunicorn --workers 2
+#
+# Every sample is taken in a new interpreter, so nothing is cached from the
+# previous run; the median over `--runs` samples is reported. --gunicorn also
+# starts real gunicorn deployments (with and without --preload) and reports
+# the time from launch until the first successful response.
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+DEFAULT_RUNS = 5
+# First requests timed in a fresh process, in this order
+FIRST_REQUESTS = (
+    ('generate/password', '/generate', {'type': 'password'}),
+    ('generate/passphrase', '/generate', {'type': 'passphrase'}),
+    ('generate/batch', '/generate/batch', {'type': 'password', 'count': 1000}),
+    ('analyze', '/analyze', {'password': 'P@ssw0rd1'}),
+)
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Seconds to wait for a gunicorn deployment to answer
+SERVER_TIMEOUT = 30.0
+
+
+def _measure_in_process(warm):
+    # Runs inside the fresh interpreter started by _sample()
+    started = time.perf_counter()
+    import app
+    result = {'import_s': time.perf_counter() - started}
+
+    started = time.perf_counter()
+    flask_app = app.create_app(warm=warm)
+    result['create_app_s'] = time.perf_counter() - started
+    result['warm_up'] = flask_app.config['WARMUP_TIMINGS']
+
+    client = flask_app.test_client()
+    for name, path, body in FIRST_REQUESTS:
+        started = time.perf_counter()
+        response = client.post(path, json=body)
+        response.get_data()  # Drains streamed responses
+        result[f'{name}_s'] = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+    result['first_response_s'] = (result['import_s'] +
+                                  result['create_app_s'] +
+                                  result['generate/password_s'])
+    return result
+
+
+def _sample(warm):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child',
+         'warm' if warm else 'cold'],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _first_gunicorn_response(workers, preload):
+    port = _free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', '-w',
+        str(workers), '-b', f'127.0.0.1:{port}'
+    ]
+    if preload:
+        command.append('--preload')
+    command.append('app:app')
+
+    body = json.dumps({'type': 'password'}).encode('utf-8')
+    started = time.perf_counter()
+    server = subprocess.Popen(command,
+                              cwd=HERE,
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < SERVER_TIMEOUT:
+            if server.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup.')
+            request = urllib.request.Request(
+                f'http://127.0.0.1:{port}/generate',
+                data=body,
+                headers={'Content-Type': 'application/json'})
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    response.read()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError('gunicorn did not answer in time.')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(runs=DEFAULT_RUNS, gunicorn_workers=None, progress=None):
+    results = {}
+    for mode in ('cold', 'warm'):
+        samples = [_sample(mode == 'warm') for _ in range(runs)]
+        summary = {
+            key: statistics.median(sample[key] for sample in samples)
+            for key in samples[0] if key.endswith('_s')
+        }
+        results[mode] = summary
+        if progress:
+            progress(mode, summary)
+
+    if gunicorn_workers:
+        for preload in (False, True):
+            mode = 'gunicorn/preload' if preload else 'gunicorn'
+            results[mode] = {
+                'first_response_s':
+                statistics.median(
+                    _first_gunicorn_response(gunicorn_workers, preload)
+                    for _ in range(runs))
+            }
+            if progress:
+                progress(mode, results[mode])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Measure import time and time-to-first-response.')
+    parser.add_argument('-n', '--runs', type=int, default=DEFAULT_RUNS,
+                        help='Fresh processes per measurement.')
+    parser.add_argument('--gunicorn', action='store_true',
+                        help='Also time real gunicorn deployments.')
+    parser.add_argument('-w', '--workers', type=int, default=2,
+                        help='Workers per gunicorn deployment.')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON.')
+    parser.add_argument('--child', choices=('cold', 'warm'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_measure_in_process(args.child == 'warm')))
+        return
+
+    def progress(mode, summary):
+        if args.json:
+            return
+        print(f'{mode}:')
+        for key, seconds in summary.items():
+            print(f'  {key[:-2]:<24} {seconds * 1000:>9.2f} ms')
+
+    results = run(args.runs, args.workers if args.gunicorn else None,
+                  progress)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# static_assets.py
+#
+# In-memory cache of the front-end files (index.html, script.js, style.css).
+# Each file is read once, stored together with a gzip-compressed copy, and
+# gets a strong ETag per encoding, so the app can answer conditional
+# requests with 304 and compressed requests without touching the disk.
+#
+# In dev mode (`revalidate=True`) every lookup compares the file's mtime and
+# size with the cached copy and rereads it when either changed, so edits
+# show up on the next reload.
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+# Front-end files the app serves
+DEFAULT_ASSETS = ('index.html', 'script.js', 'style.css')
+# Files smaller than this aren't worth compressing
+MIN_GZIP_SIZE = 256
+
+
+class Asset:
+    __slots__ = ('name', 'mimetype', 'data', 'etag', 'gzipped', 'gzip_etag',
+                 'mtime_ns', 'size')
+
+    def __init__(self, name, data, mtime_ns):
+        self.name = name
+        self.mimetype = mimetypes.guess_type(name)[0] or \
+            'application/octet-stream'
+        self.data = data
+        self.mtime_ns = mtime_ns
+        self.size = len(data)
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        self.etag = digest
+        # Different bytes, so the compressed variant needs its own strong tag
+        self.gzipped = self.gzip_etag = None
+        if len(data) >= MIN_GZIP_SIZE:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                self.gzipped = compressed
+                self.gzip_etag = digest + '-gzip'
+
+
+class StaticAssetCache:
+    """
+    Maps file names (relative to `directory`) to Assets. Only the names given
+    to preload() are cached; get() returns None for anything else, and for
+    files that don't exist.
+    """
+
+    def __init__(self, directory, names=DEFAULT_ASSETS):
+        self.directory = directory
+        self.names = frozenset(names)
+        self._assets = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _load(self, name):
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                data = f.read()
+        except FileNotFoundError:
+            self._assets.pop(name, None)
+            return None
+        asset = self._assets[name] = Asset(name, data, stat.st_mtime_ns)
+        self.loads += 1
+        return asset
+
+    def preload(self):
+        """Reads every cached file; missing ones are skipped."""
+        with self._lock:
+            for name in self.names:
+                self._load(name)
+
+    def get(self, name, revalidate=False):
+        if name not in self.names:
+            return None
+        asset = self._assets.get(name)
+        if asset is not None and not revalidate:
+            return asset
+
+        with self._lock:
+            asset = self._assets.get(name)
+            if asset is not None and revalidate:
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    self._assets.pop(name, None)
+                    return None
+                if (stat.st_mtime_ns, stat.st_size) == (asset.mtime_ns,
+                                                        asset.size):
+                    return asset
+            return self._load(name)
+
+    def stats(self):
+        assets = list(self._assets.values())
+        return {
+            'assets': len(assets),
+            'bytes': sum(asset.size for asset in assets),
+            'gzip_bytes': sum(
+                len(asset.gzipped) for asset in assets if asset.gzipped),
+            'loads': self.loads
+        }
@@ -0,0 +1,170 @@
+# wordlist_registry.py
+import math
+import os
+import threading
+
+from binary_wordlist import COMPILED_SUFFIX, MappedWordlist, compiled_path_for
+
+# Relative wordlist names are resolved against the project directory
+WORDLIST_DIR = os.path.abspath(os.path.dirname(__file__))
+
+# Wordlists shipped with the project
+BUNDLED_WORDLISTS = ('eff_long_wordlist.txt', 'eff_short_wordlist.txt')
+
+# Dummy wordlists used when a file is missing, for demonstration purposes
+_FALLBACK_WORDS = {
+    "eff_long_wordlist.txt": [
+        "apple", "banana", "cherry", "date", "elephant", "flower", "garden",
+        "happiness", "internet", "jungle", "kangaroo", "lemon", "mountain",
+        "night", "ocean", "penguin", "queen", "rainbow", "sunshine", "tiger",
+        "umbrella", "violet", "whisper", "xylophone", "yellow", "zebra"
+    ],
+    "eff_short_wordlist.txt": [
+        "cat", "dog", "bird", "fish", "tree", "rock", "sky", "moon", "star",
+        "cloud"
+    ]
+}
+_GENERIC_FALLBACK = ["word1", "word2", "word3"]
+
+
+class WordlistEntry:
+    """
+    A loaded wordlist plus the metadata strength scoring needs, so callers
+    that only want sizes never have to walk the word list itself.
+    """
+    __slots__ = ('name', 'path', 'words', 'size', 'bits_per_word',
+                 'min_word_length', 'max_word_length', 'is_fallback',
+                 '_derived', '_derived_lock')
+
+    def __init__(self, name, path, words, is_fallback=False):
+        self.name = name
+        self.path = path
+        self.words = words
+        self.size = len(words)
+        self.bits_per_word = math.log2(self.size) if self.size > 1 else 0.0
+        if isinstance(words, MappedWordlist):
+            # Compiled wordlists store their word lengths in the header
+            self.min_word_length = words.min_word_length
+            self.max_word_length = words.max_word_length
+        else:
+            self.min_word_length = min(map(len, words)) if words else 0
+            self.max_word_length = max(map(len, words)) if words else 0
+        self.is_fallback = is_fallback
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def get_derived(self, key, build):
+        """
+        Returns a structure derived from this wordlist (an index, a variant
+        table...), calling `build()` the first time it is requested. Derived
+        structures live as long as the entry, so each is built only once.
+        """
+        value = self._derived.get(key)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = build()
+                    self._derived[key] = value
+        return value
+
+    def __repr__(self):
+        return f"WordlistEntry({self.name!r}, size={self.size})"
+
+
+_ENTRIES = {}
+_LOAD_LOCKS = {}
+_REGISTRY_LOCK = threading.Lock()
+_LOAD_COUNT = 0
+
+
+def resolve_path(name):
+    return name if os.path.isabs(name) else os.path.join(WORDLIST_DIR, name)
+
+
+def wordlist_exists(name):
+    """Whether `name` is backed by a file rather than a dummy wordlist."""
+    return os.path.exists(resolve_path(name))
+
+
+def _compiled_variant(path):
+    # Prefer an up-to-date compiled copy sitting next to a text wordlist
+    if path.endswith(COMPILED_SUFFIX):
+        return path
+    compiled = compiled_path_for(path)
+    try:
+        if os.path.getmtime(compiled) >= os.path.getmtime(path):
+            return compiled
+    except OSError:
+        pass
+    return None
+
+
+def _read_wordlist(name):
+    path = resolve_path(name)
+    compiled = _compiled_variant(path)
+    if compiled is not None:
+        try:
+            return WordlistEntry(name, compiled, MappedWordlist(compiled))
+        except FileNotFoundError:
+            pass  # Fall through to the text file / dummy wordlist handling
+        except (OSError, ValueError) as e:
+            raise IOError(f"Error loading wordlist: {e}")
+
+    try:
+        with open(path, 'r') as f:
+            words = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        print(
+            f"Warning: Wordlist file not found at: {name}. Using a dummy wordlist."
+        )
+        words = _FALLBACK_WORDS.get(name, _GENERIC_FALLBACK)
+        return WordlistEntry(name, path, list(words), is_fallback=True)
+    except Exception as e:
+        raise IOError(f"Error loading wordlist: {e}")
+
+    if not words:
+        raise ValueError(
+            f"Wordlist file '{name}' is empty or could not be read.")
+    return WordlistEntry(name, path, words)
+
+
+def get_wordlist(name="eff_long_wordlist.txt"):
+    """
+    Returns the WordlistEntry for `name`, reading the file on first use.
+    Each wordlist is loaded exactly once per process, even when several
+    threads ask for it at the same time.
+    """
+    entry = _ENTRIES.get(name)
+    if entry is not None:
+        return entry
+
+    with _REGISTRY_LOCK:
+        load_lock = _LOAD_LOCKS.setdefault(name, threading.Lock())
+
+    # Per-name lock: concurrent first requests wait for a single load,
+    # while loads of different wordlists don't block each other.
+    with load_lock:
+        entry = _ENTRIES.get(name)
+        if entry is None:
+            global _LOAD_COUNT
+            entry = _read_wordlist(name)
+            _ENTRIES[name] = entry
+            _LOAD_COUNT += 1
+    return entry
+
+
+def registry_stats():
+    return {
+        'loaded': len(_ENTRIES),
+        'loads': _LOAD_COUNT,
+        'wordlists': {
+            name: {
+                'size': entry.size,
+                'bits_per_word': entry.bits_per_word,
+                'mapped': isinstance(entry.words, MappedWordlist),
+                'is_fallback': entry.is_fallback
+            }
+            for name, entry in list(_ENTRIES.items())
+        }
+    }